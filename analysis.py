@@ -1,30 +1,53 @@
 # analysis.py
 import pandas as pd
 import numpy as np
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
-from scipy.stats import chi2, f_oneway, mannwhitneyu
+from config import SENTIMENT_BATCH_SIZE
+from lexicon import load_vader_lexicon
+
+
+def make_vader_analyzer():
+    """
+    Build a VADER SentimentIntensityAnalyzer from the locally cached lexicon,
+    skipping NLTK's download check and text parsing on every start.
+    """
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+    class CachedSentimentIntensityAnalyzer(SentimentIntensityAnalyzer):
+        def __init__(self, lexicon):
+            self.lexicon = lexicon
+            self.constants = VaderConstants()
+
+    return CachedSentimentIntensityAnalyzer(load_vader_lexicon())
 
-# Ensure the VADER lexicon is available.
-nltk.download('vader_lexicon')
 
 class SentimentAnalyzer:
-    def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
+    def __init__(self, backend="vader", batch_size=SENTIMENT_BATCH_SIZE):
+        self.backend_name = backend
+        self.batch_size = batch_size
+        self._backend = None
+
+    @property
+    def backend(self):
+        # Loaded on first use, so running only the statistics never loads a scorer.
+        if self._backend is None:
+            from sentiment_backends import get_backend
+            self._backend = get_backend(self.backend_name)
+        return self._backend
 
     def perform_sentiment_analysis(self, df):
-        def classify(text):
-            if pd.isnull(text):
-                return None, None
-            score = self.sia.polarity_scores(text)['compound']
-            if score >= 0.05:
-                return score, 'positive'
-            elif score <= -0.05:
-                return score, 'negative'
-            else:
-                return score, 'neutral'
-        df[['compound_score', 'sentiment']] = df.apply(
-            lambda row: pd.Series(classify(row['headline'])), axis=1)
+        """
+        Score the 'headline' column with the selected backend, batch by batch,
+        adding 'compound_score' and 'sentiment' columns.
+        """
+        headlines = df['headline'].tolist()
+        scores = np.full(len(headlines), np.nan)
+        labels = []
+        for start in range(0, len(headlines), self.batch_size):
+            batch_scores, batch_labels = self.backend.score_batch(headlines[start:start + self.batch_size])
+            scores[start:start + len(batch_scores)] = batch_scores
+            labels.extend(batch_labels)
+        df['compound_score'] = scores
+        df['sentiment'] = pd.Series(labels, index=df.index, dtype=object)
         return df
 
     def get_significance_symbol(self, p):
@@ -48,6 +71,8 @@ class SentimentAnalyzer:
         P-values are formatted: if computed as 0, they are displayed as "<1e-10".
         Returns a dictionary of results, including a supplementary table (DataFrame).
         """
+        from scipy.stats import chi2, f_oneway, mannwhitneyu
+
         # Count sentiments from the dataframe.
         sentiment_counts = df['sentiment'].value_counts(dropna=True)
         total_classified = sentiment_counts.sum()
@@ -75,14 +100,6 @@ class SentimentAnalyzer:
         # Mann–Whitney U test between positive and negative headlines.
         mwu_stat, mwu_p = mannwhitneyu(group_pos, group_neg, alternative='two-sided')
 
-        # Function to format p-values.
-        def format_p(p):
-            return "<1e-10" if p == 0 else "{:.4g}".format(p)
-
-        chi2_p_str = format_p(chi2_p)
-        anova_p_str = format_p(anova_p)
-        mwu_p_str = format_p(mwu_p)
-
         # Define an inner function for Cliff's delta.
         def cliffs_delta(lst1, lst2):
             n1, n2 = len(lst1), len(lst2)
@@ -92,6 +109,27 @@ class SentimentAnalyzer:
             return (greater - lesser) / (n1 * n2) if n1 * n2 > 0 else 0
 
         raw_cliffs_d = cliffs_delta(group_pos.tolist(), group_neg.tolist())
+
+        return self.build_results(sentiment_counts, chi2_stat, chi2_p, f_stat, anova_p, eta_sq,
+                                  mwu_stat, mwu_p, raw_cliffs_d)
+
+    def build_results(self, sentiment_counts, chi2_stat, chi2_p, f_stat, anova_p, eta_sq,
+                      mwu_stat, mwu_p, raw_cliffs_d):
+        """
+        Derive effect sizes, significance symbols and the supplementary table
+        from the raw test statistics, and return the results dictionary.
+        Shared by the full and the incremental (incremental_stats.py) paths.
+        """
+        total_classified = sentiment_counts.sum()
+
+        # Function to format p-values.
+        def format_p(p):
+            return "<1e-10" if p == 0 else "{:.4g}".format(p)
+
+        chi2_p_str = format_p(chi2_p)
+        anova_p_str = format_p(anova_p)
+        mwu_p_str = format_p(mwu_p)
+
         # Use a small epsilon to check for near-maximum effect.
         EPS = 1e-9
         if abs(1.0 - raw_cliffs_d) < EPS:
@@ -0,0 +1,318 @@
+# archive.py
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import zlib
+from collections import OrderedDict
+
+from artifacts import content_hash
+from config import ARCHIVE_CONFIG
+
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+CODEC_NAMES = {"zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+# Every block starts with this header: magic, codec, number of articles and
+# length of the compressed payload that follows.
+BLOCK_HEADER = struct.Struct("<4sBII")
+BLOCK_MAGIC = b"RAW1"
+
+DATA_FILE = "articles.dat"
+INDEX_FILE = "index.db"
+
+
+def _zstandard():
+    # zstandard is optional; without it blocks are written with zlib.
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def compress(data, codec, level):
+    if codec == CODEC_ZSTD:
+        return _zstandard().ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def decompress(data, codec):
+    if codec == CODEC_ZSTD:
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise RuntimeError("This archive block is zstd-compressed; install the 'zstandard' package.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def archive_directory(db_name, directory=ARCHIVE_CONFIG["directory"]):
+    """The archive directory for a database: the configured one, or raw_archive/ next to the database."""
+    if directory:
+        return directory
+    return os.path.join(os.path.dirname(os.path.abspath(db_name)), "raw_archive")
+
+
+def _field(article, path):
+    # Dotted paths reach into nested objects, e.g. "source.name" or "fields.trailText".
+    value = article
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class RawArticleArchive:
+    """
+    Append-only archive of the raw API results seen during collection.
+
+    Articles are written in blocks, one block per result page: each block is
+    a header followed by the compressed JSON lines [article_id, source,
+    article]. Blocks are compressed with zstd when the zstandard package is
+    installed and with zlib otherwise; the codec is stored per block, so an
+    archive can hold both. The data file is only ever appended to.
+
+    The index (a SQLite file next to the data file) maps every article id
+    (the Guardian's "id", NewsAPI's URL) to its block offset and position
+    within the block, so an article already archived is never written again.
+    Reads go through a memory map of the data file: get() decompresses a
+    single block, and scan() walks the blocks in file order.
+
+    Appends hold the index's write lock (BEGIN IMMEDIATE) while writing the
+    block, so several processes can share one archive. Blocks left without
+    index entries by a crash are re-indexed (or, if incomplete, cut off)
+    the next time the archive is opened.
+    """
+    def __init__(self, directory, codec=ARCHIVE_CONFIG["codec"], level=ARCHIVE_CONFIG["level"],
+                 timeout=60, cached_blocks=8):
+        if codec not in CODEC_NAMES:
+            raise ValueError(f"Unknown archive codec: {codec!r}")
+        if codec == "zstd" and _zstandard() is None:
+            codec = "zlib"
+        self.directory = directory
+        self.codec = CODEC_NAMES[codec]
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, DATA_FILE)
+        self.data_file = open(self.data_path, "a+b")
+        self._map = None
+        # Decompressed blocks (lists of JSON lines), most recently used last.
+        self._blocks = OrderedDict()
+        self.cached_blocks = cached_blocks
+        # Autocommit mode: transactions are opened explicitly where needed.
+        self.conn = sqlite3.connect(os.path.join(directory, INDEX_FILE), timeout=timeout,
+                                    isolation_level=None)
+        self.initialize()
+
+    def initialize(self):
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS raw_blocks (
+                block_offset INTEGER PRIMARY KEY,
+                length INTEGER NOT NULL,
+                codec INTEGER NOT NULL,
+                articles INTEGER NOT NULL,
+                raw_bytes INTEGER NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS raw_articles (
+                article_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                block_offset INTEGER NOT NULL,
+                position INTEGER NOT NULL
+            )
+        ''')
+        self.recover()
+
+    def _file_size(self):
+        return os.fstat(self.data_file.fileno()).st_size
+
+    def _read_at(self, offset, length):
+        self.data_file.seek(offset)
+        return self.data_file.read(length)
+
+    def _index_block(self, offset, codec, lines, compressed_length):
+        self.conn.execute("INSERT INTO raw_blocks VALUES (?, ?, ?, ?, ?)",
+                          (offset, BLOCK_HEADER.size + compressed_length, codec, len(lines),
+                           sum(len(line) for line in lines)))
+        rows = []
+        for position, line in enumerate(lines):
+            article_id, source, _ = json.loads(line)
+            rows.append((article_id, source, offset, position))
+        self.conn.executemany("INSERT OR IGNORE INTO raw_articles VALUES (?, ?, ?, ?)", rows)
+
+    def recover(self):
+        """
+        Bring the index in line with the data file after an interrupted append:
+        drop index entries for blocks missing from the file, index complete
+        blocks found after the last indexed one, and cut off a partial block.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            size = self._file_size()
+            dropped = self.conn.execute("SELECT COUNT(*) FROM raw_blocks WHERE block_offset + length > ?",
+                                        (size,)).fetchone()[0]
+            if dropped:
+                self.conn.execute('''
+                    DELETE FROM raw_articles WHERE block_offset IN (
+                        SELECT block_offset FROM raw_blocks WHERE block_offset + length > ?)
+                ''', (size,))
+                self.conn.execute("DELETE FROM raw_blocks WHERE block_offset + length > ?", (size,))
+            offset = self.conn.execute(
+                "SELECT COALESCE(MAX(block_offset + length), 0) FROM raw_blocks").fetchone()[0]
+            recovered = 0
+            while offset + BLOCK_HEADER.size <= size:
+                magic, codec, count, length = BLOCK_HEADER.unpack(self._read_at(offset, BLOCK_HEADER.size))
+                end = offset + BLOCK_HEADER.size + length
+                if magic != BLOCK_MAGIC or end > size:
+                    break
+                payload = self._read_at(offset + BLOCK_HEADER.size, length)
+                try:
+                    lines = decompress(payload, codec).split(b"\n")
+                except (zlib.error, RuntimeError, ValueError):
+                    break
+                if len(lines) != count:
+                    break
+                self._index_block(offset, codec, lines, length)
+                recovered += 1
+                offset = end
+            if offset < size:
+                self.data_file.truncate(offset)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        if dropped or recovered or offset < size:
+            print(f"Archive recovered: {dropped} missing block(s) unindexed, {recovered} block(s) "
+                  f"re-indexed, {size - offset} trailing bytes removed.")
+
+    def _existing_ids(self, article_ids):
+        existing = set()
+        article_ids = list(article_ids)
+        # Stay below SQLite's limit on bound parameters.
+        for start in range(0, len(article_ids), 500):
+            chunk = article_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(row[0] for row in self.conn.execute(
+                f"SELECT article_id FROM raw_articles WHERE article_id IN ({placeholders})", chunk))
+        return existing
+
+    def append(self, source, articles):
+        """
+        Archive the raw results of one page, given as (article_id, article)
+        pairs, as a single block. Articles whose id is already archived are
+        skipped; a missing id is replaced by a hash of the article's content.
+        Returns the number of articles written.
+        """
+        batch = {}
+        for article_id, article in articles:
+            if not article_id:
+                article_id = f"{source}:sha256:{content_hash(article)}"
+            batch.setdefault(str(article_id), article)
+        if not batch:
+            return 0
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self._existing_ids(batch)
+            lines = [
+                json.dumps([article_id, source, article], ensure_ascii=False,
+                           separators=(",", ":")).encode("utf-8")
+                for article_id, article in batch.items() if article_id not in existing
+            ]
+            if lines:
+                payload = compress(b"\n".join(lines), self.codec, self.level)
+                # Appends are serialised by the lock, so the current end is this block's offset.
+                offset = self._file_size()
+                self.data_file.write(BLOCK_HEADER.pack(BLOCK_MAGIC, self.codec, len(lines), len(payload))
+                                     + payload)
+                self.data_file.flush()
+                self._index_block(offset, self.codec, lines, len(payload))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(lines)
+
+    def _mapping(self, end):
+        # Map the file again once it has grown past the current mapping.
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _block_lines(self, offset, length):
+        lines = self._blocks.get(offset)
+        if lines is not None:
+            self._blocks.move_to_end(offset)
+            return lines
+        data = self._mapping(offset + length)
+        magic, codec, _, payload_length = BLOCK_HEADER.unpack_from(data, offset)
+        if magic != BLOCK_MAGIC:
+            raise ValueError(f"No archive block at offset {offset} of '{self.data_path}'.")
+        start = offset + BLOCK_HEADER.size
+        lines = decompress(data[start:start + payload_length], codec).split(b"\n")
+        self._blocks[offset] = lines
+        if len(self._blocks) > self.cached_blocks:
+            self._blocks.popitem(last=False)
+        return lines
+
+    def get(self, article_id):
+        """The archived raw result with this id, or None."""
+        row = self.conn.execute('''
+            SELECT a.block_offset, b.length, a.position
+            FROM raw_articles a JOIN raw_blocks b ON b.block_offset = a.block_offset
+            WHERE a.article_id = ?
+        ''', (article_id,)).fetchone()
+        if row is None:
+            return None
+        offset, length, position = row
+        return json.loads(self._block_lines(offset, length)[position])[2]
+
+    def __contains__(self, article_id):
+        return self.conn.execute("SELECT 1 FROM raw_articles WHERE article_id = ?",
+                                 (article_id,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM raw_articles").fetchone()[0]
+
+    def scan(self, source=None):
+        """
+        Yield (article_id, source, article) for every archived article in the
+        order they were written, optionally only those of one source.
+        """
+        blocks = self.conn.execute(
+            "SELECT block_offset, length, codec FROM raw_blocks ORDER BY block_offset").fetchall()
+        if not blocks:
+            return
+        data = self._mapping(blocks[-1][0] + blocks[-1][1])
+        for offset, length, codec in blocks:
+            start = offset + BLOCK_HEADER.size
+            for line in decompress(data[start:offset + length], codec).split(b"\n"):
+                article_id, article_source, article = json.loads(line)
+                if source is None or article_source == source:
+                    yield article_id, article_source, article
+
+    def export_fields(self, fields, source=None):
+        """Yield [article_id, source, *values] rows of the given (dotted) fields from a full scan."""
+        for article_id, article_source, article in self.scan(source):
+            yield [article_id, article_source] + [_field(article, field) for field in fields]
+
+    def stats(self):
+        """Per-source article counts and the archive's raw and compressed sizes."""
+        counts = dict(self.conn.execute(
+            "SELECT source, COUNT(*) FROM raw_articles GROUP BY source ORDER BY source").fetchall())
+        blocks, stored, raw = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_bytes), 0) FROM raw_blocks").fetchone()
+        return {"articles": counts, "blocks": blocks, "stored_bytes": stored, "raw_bytes": raw}
+
+    def close(self):
+        self._blocks.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.data_file.close()
+        self.conn.close()
@@ -0,0 +1,74 @@
+# artifacts.py
+import hashlib
+import json
+
+# Bump a stage's version whenever the format or meaning of its output changes;
+# stored artifacts with an older version are then recomputed.
+STAGE_VERSIONS = {
+    "scores": 1,
+    "stats": 3,
+    "permutation": 1,
+}
+
+
+def content_hash(*parts):
+    """
+    Combine strings (or JSON-serialisable values) into a single sha256 hex digest.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def is_up_to_date(artifact, stage, input_hash):
+    """
+    True if the stored artifact was produced by the current stage version
+    from exactly these inputs.
+    """
+    return (
+        artifact is not None
+        and artifact["version"] == STAGE_VERSIONS[stage]
+        and artifact["input_hash"] == input_hash
+    )
+
+
+def _to_builtin(value):
+    # numpy scalars expose item(); plain Python values pass through.
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def stats_to_payload(stats_results):
+    """
+    Convert the dictionary returned by perform_statistical_tests into a
+    JSON-serialisable payload.
+    """
+    payload = {}
+    for key, value in stats_results.items():
+        if key == "sentiment_counts":
+            payload[key] = {str(k): int(v) for k, v in value.items()}
+        elif key == "supplementary_table":
+            payload[key] = {
+                "columns": list(value.columns),
+                "rows": [[_to_builtin(v) for v in row] for row in value.values.tolist()],
+            }
+        else:
+            payload[key] = _to_builtin(value)
+    return payload
+
+
+def payload_to_stats(payload):
+    """
+    Rebuild the perform_statistical_tests dictionary from a stored payload.
+    """
+    import pandas as pd
+    stats_results = dict(payload)
+    stats_results["sentiment_counts"] = pd.Series(payload["sentiment_counts"], dtype="int64")
+    table = payload["supplementary_table"]
+    stats_results["supplementary_table"] = pd.DataFrame(table["rows"], columns=table["columns"])
+    return stats_results
@@ -0,0 +1,138 @@
+# benchmarks/bench_crawl_queue.py
+"""
+Run the shared crawl queue with several local worker processes against the
+stub Guardian API and check the result.
+
+The run fails (exit code 1) unless every task is done, the headlines
+table holds exactly the headlines the stub serves, with no duplicates, and
+the workers' shared raw archive holds every served result exactly once,
+including the fields and tags the crawler requests (GUARDIAN_CONFIG).
+With --kill-one, one extra worker is killed while holding a lease to check
+that its task is reclaimed once the lease expires.
+
+Usage:
+    python benchmarks/bench_crawl_queue.py [--workers 4] [--kill-one]
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from archive import RawArticleArchive, archive_directory  # noqa: E402
+from crawl_queue import CrawlQueue, run_worker, split_date_range  # noqa: E402
+from stub_guardian import expected_headlines, start_stub_server  # noqa: E402
+
+KEYWORDS = ["TikTok", "Instagram", "smartphones", "doomscrolling", "WhatsApp", "reels"]
+FROM_DATE = datetime.date(2023, 1, 1)
+TO_DATE = datetime.date(2024, 12, 31)
+WINDOW_DAYS = 90
+PAGES_PER_TASK = 2
+
+
+def worker_main(db_name, base_url, worker_id, lease_seconds, retry_delay):
+    # Silence per-page progress output from the workers.
+    sys.stdout = open(os.devnull, "w")
+    run_worker(db_name, worker_id=worker_id, api_keys=["stub-key"], base_url=base_url,
+               lease_seconds=lease_seconds, retry_delay=retry_delay, poll_interval=0.2,
+               page_delay=0, page_size=50)
+
+
+def wait_for_lease(db_name, worker_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        conn = sqlite3.connect(db_name, timeout=30)
+        try:
+            row = conn.execute("SELECT 1 FROM crawl_tasks WHERE status = 'leased' AND worker_id = ?",
+                               (worker_id,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        finally:
+            conn.close()
+        if row:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl work-queue benchmark against a stub API")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--kill-one", action="store_true",
+                        help="Kill an extra worker mid-task to exercise lease reclamation.")
+    parser.add_argument("--lease-seconds", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of stub requests answered with HTTP 500.")
+    parser.add_argument("--retry-delay", type=float, default=0.1,
+                        help="Seconds before a failed task is first retried (default 0.1).")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Seconds the stub delays each response (default 0.05).")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(error_rate=args.error_rate, latency=args.latency)
+    tmp_dir = tempfile.mkdtemp(prefix="crawl_queue_")
+    db_name = os.path.join(tmp_dir, "headlines.db")
+
+    queue = CrawlQueue(db_name, lease_seconds=args.lease_seconds)
+    tasks = queue.seed(KEYWORDS, FROM_DATE, TO_DATE, window_days=WINDOW_DAYS,
+                       pages_per_task=PAGES_PER_TASK)
+    print(f"Seeded {tasks} tasks into {db_name}")
+
+    start = time.perf_counter()
+    processes = []
+    if args.kill_one:
+        victim = multiprocessing.Process(target=worker_main,
+                                         args=(db_name, base_url, "victim", args.lease_seconds,
+                                               args.retry_delay))
+        victim.start()
+        if wait_for_lease(db_name, "victim"):
+            victim.kill()
+            print("Killed worker 'victim' while it held a lease.")
+        victim.join()
+    for i in range(args.workers):
+        process = multiprocessing.Process(target=worker_main,
+                                          args=(db_name, base_url, f"worker-{i}", args.lease_seconds,
+                                                args.retry_delay))
+        process.start()
+        processes.append(process)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    expected = set()
+    for keyword in KEYWORDS:
+        for window_start, window_end in split_date_range(FROM_DATE, TO_DATE, WINDOW_DAYS):
+            expected |= expected_headlines(keyword, window_start.isoformat(), window_end.isoformat())
+
+    conn = sqlite3.connect(db_name)
+    stored = conn.execute("SELECT source, headline, date FROM headlines").fetchall()
+    status = dict(conn.execute("SELECT status, COUNT(*) FROM crawl_tasks GROUP BY status").fetchall())
+    reclaimed = conn.execute("SELECT COUNT(*) FROM crawl_tasks WHERE attempts > 1").fetchone()[0]
+    conn.close()
+    raw_archive = RawArticleArchive(archive_directory(db_name))
+    archived_ids = []
+    missing_extras = 0
+    for article_id, _, article in raw_archive.scan():
+        archived_ids.append(article_id)
+        if not article.get("fields", {}).get("trailText") or not article.get("tags"):
+            missing_extras += 1
+    raw_archive.close()
+
+    print(f"Task status: {status} ({reclaimed} tasks needed more than one attempt)")
+    print(f"Stored {len(stored)} headlines ({len(set(stored))} unique), expected {len(expected)}")
+    print(f"Archived {len(archived_ids)} raw results ({len(set(archived_ids))} unique, "
+          f"{missing_extras} without trail text or tags)")
+    print(f"{args.workers} workers: {elapsed:.2f}s, {len(stored) / elapsed:,.0f} headlines/s")
+
+    ok = (set(stored) == expected and len(stored) == len(expected) and set(status) == {"done"}
+          and len(archived_ids) == len(set(archived_ids)) == len(expected) and not missing_extras)
+    print("OK" if ok else "MISMATCH")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,146 @@
+# benchmarks/bench_headline_memory.py
+"""
+Measure the peak memory of a collection run, per 100k headlines.
+
+Synthetic Guardian result pages are fed through two collection paths, each
+in a fresh process, and written to a temporary database:
+
+  dicts    the previous path: one dict per article, collected into a list,
+           re-keyed into a dict for deduplication, converted to a DataFrame
+           and back with to_dict("records"), then stored.
+  records  the current path: GuardianScraper.parse_article builds slotted
+           HeadlineRecord objects, which MultiSourceCollector deduplicates
+           and upserts page by page.
+
+Peak RSS is read with getrusage after the run, minus the peak before it.
+
+Usage:
+    python benchmarks/bench_headline_memory.py [--headlines 200000] [--duplicates 0.1]
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGE_SIZE = 200
+WORDS = ("TikTok", "Instagram", "teenagers", "screen", "time", "ban", "apps", "parents",
+         "school", "phones", "study", "warns", "new", "rules", "social", "media", "mental",
+         "health", "children", "online", "safety", "law", "tech", "giants", "report")
+
+
+def synthetic_pages(n_headlines, duplicates, seed=0):
+    """Yield pages of raw Guardian API results; a fraction repeat earlier headlines."""
+    rng = random.Random(seed)
+    made = []
+    for start in range(0, n_headlines, PAGE_SIZE):
+        page = []
+        for i in range(start, min(start + PAGE_SIZE, n_headlines)):
+            if made and rng.random() < duplicates:
+                title, day = rng.choice(made)
+            else:
+                title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))) + f" ({i})"
+                day = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                if len(made) < 10000:
+                    made.append((title, day))
+            page.append({
+                "id": f"technology/2024/{i}",
+                "type": "article",
+                "sectionId": "technology",
+                "sectionName": "Technology",
+                "webPublicationDate": f"{day}T08:30:00Z",
+                "webTitle": title,
+                "webUrl": f"https://www.theguardian.com/technology/2024/{i}",
+                "apiUrl": f"https://content.guardianapis.com/technology/2024/{i}",
+                "isHosted": False,
+                "pillarId": "pillar/news",
+                "pillarName": "News",
+            })
+        yield page
+
+
+def run_dicts(db, n_headlines, duplicates):
+    import pandas as pd
+
+    def parse_article(art):
+        headline = art.get("webTitle", "").strip()
+        pub_date = art.get("webPublicationDate", None)
+        return {
+            "source": "The Guardian",
+            "headline": headline,
+            "date": pub_date.split("T")[0] if pub_date else None,
+            "accessible": True
+        }
+
+    all_headlines = []
+    for articles in synthetic_pages(n_headlines, duplicates):
+        all_headlines.extend(parse_article(art) for art in articles)
+    deduped = {(item["source"], item["headline"], item["date"]): item for item in all_headlines}
+    new_headlines = list(deduped.values())
+    combined = pd.DataFrame(new_headlines).drop_duplicates(subset=["source", "headline", "date"])
+    records = combined.to_dict("records")
+    db.conn.executemany(
+        "INSERT INTO headlines (source, headline, date, accessible) VALUES (?, ?, ?, ?)",
+        ((r["source"], r["headline"], r["date"], int(r["accessible"])) for r in records))
+    db.conn.commit()
+
+
+def run_records(db, n_headlines, duplicates):
+    from collector import MultiSourceCollector
+    from scrapers.guardian_scraper import GuardianScraper
+
+    class SyntheticGuardianScraper(GuardianScraper):
+        def iter_pages(self):
+            for page, articles in enumerate(synthetic_pages(n_headlines, duplicates), 1):
+                yield "synthetic", page, articles
+
+    scraper = SyntheticGuardianScraper([], None, None, ["synthetic"], page_size=PAGE_SIZE)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        MultiSourceCollector([scraper], db).run()
+
+
+MODES = {"dicts": run_dicts, "records": run_records}
+
+
+def measure(mode, n_headlines, duplicates, results):
+    from database import DatabaseManager
+    import pandas  # noqa: F401  Imported up front so its footprint is not counted.
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "headlines.db"))
+        db.initialize_database()
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        MODES[mode](db, n_headlines, duplicates)
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stored = db.count_headlines()
+        db.close()
+    # ru_maxrss is in KiB on Linux.
+    results[mode] = ((after - before) / 1024, stored)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--headlines", type=int, default=200000, help="Number of API results to collect.")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Fraction of repeated results.")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for mode in MODES:
+        process = context.Process(target=measure, args=(mode, args.headlines, args.duplicates, results))
+        process.start()
+        process.join()
+        if process.exitcode:
+            sys.exit(f"Mode '{mode}' failed with exit code {process.exitcode}.")
+
+    print(f"{args.headlines} results, {args.duplicates:.0%} duplicates")
+    print(f"  {'path':8s} {'stored':>8s} {'peak RSS MB':>12s} {'MB per 100k':>12s}")
+    for mode in MODES:
+        peak, stored = results[mode]
+        print(f"  {mode:8s} {stored:8d} {peak:12.1f} {peak * 100000 / args.headlines:12.1f}")
@@ -0,0 +1,111 @@
+# benchmarks/bench_permutation.py
+"""
+Time the per-subgroup permutation tests on synthetic subgroups.
+
+Subgroup sizes follow a log-normal distribution (many small groups, a few
+large ones), and some subgroups have a shifted score distribution so that
+both sides of alpha are exercised. The engine is run in this process and
+across a process pool; the two runs must give identical results, since
+every subgroup's random stream depends only on the seed and its name.
+
+For comparison, a naive loop (one np.random.permutation and one scipy
+call per relabelling, a fixed number of relabellings, no early stopping)
+is timed on a sample of subgroups and extrapolated to all of them.
+
+Usage:
+    python benchmarks/bench_permutation.py [--subgroups 3000] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from config import PERMUTATION_CONFIG  # noqa: E402
+from incremental_stats import GROUPS  # noqa: E402
+from permutation_tests import RESULT_COLUMNS, run_permutation_tests  # noqa: E402
+from sentiment_backends import label_scores  # noqa: E402
+
+
+def synthetic_subgroups(count, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = {group: code for code, group in enumerate(GROUPS)}
+    subgroups = []
+    for i in range(count):
+        n = int(min(20000, max(2, rng.lognormal(3.5, 1.3))))
+        shift = 0.15 if i % 10 == 0 else 0.0
+        scores = np.round(np.clip(rng.normal(-0.05 + shift, 0.45, n), -1, 1), 4)
+        labels = np.array([codes[label] for label in label_scores(scores)], dtype=np.int8)
+        subgroups.append((f"source-{i:05d}", scores, labels))
+    return subgroups
+
+
+def naive_seconds(subgroups, permutations, sample, seed=0):
+    """Seconds per subgroup for a plain Python permutation loop over the three tests."""
+    from scipy.stats import chi2_contingency, f_oneway, mannwhitneyu
+
+    totals = sum(np.bincount(labels, minlength=3) for _, _, labels in subgroups)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(subgroups), size=sample, replace=False)
+    start = time.perf_counter()
+    for index in picks:
+        _, scores, labels = subgroups[index]
+        counts = np.bincount(labels, minlength=3)
+        for _ in range(permutations):
+            shuffled = rng.permutation(labels)
+            groups = [scores[shuffled == code] for code in range(3) if (shuffled == code).any()]
+            if len(groups) > 1:
+                f_oneway(*groups)
+            if (shuffled == 0).any() and (shuffled == 1).any():
+                mannwhitneyu(scores[shuffled == 0], scores[shuffled == 1])
+            sub = rng.multivariate_hypergeometric(totals, int(counts.sum()))
+            table = np.array([sub, totals - sub])
+            if (table.sum(axis=0) > 0).all() and (table.sum(axis=1) > 0).all():
+                chi2_contingency(table, correction=False)
+    return (time.perf_counter() - start) / sample
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subgroups", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--naive-sample", type=int, default=5,
+                        help="Subgroups timed with the naive loop (default 5).")
+    parser.add_argument("--naive-permutations", type=int, default=1000)
+    args = parser.parse_args()
+
+    subgroups = synthetic_subgroups(args.subgroups)
+    sizes = np.array([len(scores) for _, scores, _ in subgroups])
+    print(f"{len(subgroups)} subgroups, {sizes.sum()} headlines "
+          f"(median size {int(np.median(sizes))}, largest {sizes.max()})")
+
+    timings = {}
+    results = {}
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        results[workers] = run_permutation_tests(subgroups, PERMUTATION_CONFIG, workers=workers)
+        timings[workers] = time.perf_counter() - start
+        print(f"  engine, {workers} worker(s): {timings[workers]:7.1f}s "
+              f"({len(subgroups) / timings[workers]:,.0f} subgroups/s)")
+
+    rows = results[1]
+    column = {name: i for i, name in enumerate(RESULT_COLUMNS)}
+    for test in ("chi2", "anova", "mwu"):
+        methods = [row[column[f"{test}_method"]] for row in rows]
+        drawn = [row[column[f"{test}_permutations"]] for row in rows if row[column[f"{test}_method"]] == "permutation"]
+        print(f"  {test:5s}: {methods.count('exact'):5d} exact, {len(drawn):5d} sampled, "
+              f"mean {np.mean(drawn) if drawn else 0:,.0f} permutations "
+              f"(cap {PERMUTATION_CONFIG['max_permutations']:,})")
+
+    per_subgroup = naive_seconds(subgroups, args.naive_permutations, args.naive_sample)
+    print(f"  naive loop, {args.naive_permutations} permutations: {per_subgroup:.2f}s per subgroup, "
+          f"~{per_subgroup * len(subgroups) / 60:,.0f} min for all subgroups")
+
+    identical = all(
+        repr(results[workers]) == repr(rows) for workers in results)
+    print("Results identical across worker counts:", "yes" if identical else "NO")
+    sys.exit(0 if identical else 1)
@@ -0,0 +1,99 @@
+# benchmarks/bench_sentiment_backends.py
+"""
+Compare sentiment backends on a labelled local sample.
+
+The sample is a CSV file with a 'headline' column and, optionally, a
+'label' column (positive/negative/neutral). For every backend the script
+reports throughput (headlines/s), p50/p99 batch latency, the Python memory
+still held once the backend is built (lexicon, model), the peak Python memory
+over construction and scoring together, agreement with VADER's labels and,
+when labels are present, accuracy against them.
+
+Usage:
+    python benchmarks/bench_sentiment_backends.py sample.csv [--batch-size 256]
+        [--backends vader,lexicon,tfidf]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from sentiment_backends import available_backends, get_backend  # noqa: E402
+
+
+def load_sample(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    headlines = [row["headline"] for row in rows]
+    labels = [row.get("label") or None for row in rows]
+    return headlines, labels if any(labels) else None
+
+
+def run_backend(name, headlines, batch_size):
+    """
+    Build the backend and score the headlines in batches, tracing Python
+    allocations from before construction so loading the lexicon or model
+    counts towards the peak.
+    """
+    latencies = []
+    predicted = []
+    tracemalloc.start()
+    try:
+        backend = get_backend(name)
+    except BaseException:
+        tracemalloc.stop()
+        raise
+    built, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for i in range(0, len(headlines), batch_size):
+        batch_start = time.perf_counter()
+        _, labels = backend.score_batch(headlines[i:i + batch_size])
+        latencies.append(time.perf_counter() - batch_start)
+        predicted.extend(labels)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return predicted, elapsed, np.array(latencies), built, peak
+
+
+def agreement(a, b):
+    return float(np.mean([x == y for x, y in zip(a, b)]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentiment backend accuracy/throughput benchmark")
+    parser.add_argument("sample", help="CSV with a 'headline' column and an optional 'label' column.")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--backends", default=",".join(available_backends()),
+                        help="Comma-separated backends to compare (default: all).")
+    args = parser.parse_args()
+
+    headlines, gold = load_sample(args.sample)
+    print(f"{len(headlines)} headlines, batch size {args.batch_size}")
+
+    results = {}
+    for name in ["vader"] + [b for b in args.backends.split(",") if b != "vader"]:
+        try:
+            results[name] = run_backend(name, headlines, args.batch_size)
+        except (FileNotFoundError, ImportError) as e:
+            print(f"Skipping '{name}': {e}")
+
+    vader_labels = results["vader"][0]
+    header = f"{'backend':8s} {'headlines/s':>12s} {'p50 ms':>8s} {'p99 ms':>8s} {'built MiB':>10s} {'peak MiB':>9s} {'vs VADER':>9s}"
+    if gold:
+        header += f" {'accuracy':>9s}"
+    print(header)
+    for name, (predicted, elapsed, latencies, built, peak) in results.items():
+        line = (f"{name:8s} {len(headlines) / elapsed:12,.0f} "
+                f"{np.percentile(latencies, 50) * 1000:8.2f} {np.percentile(latencies, 99) * 1000:8.2f} "
+                f"{built / 2 ** 20:10.1f} {peak / 2 ** 20:9.1f} {agreement(predicted, vader_labels):9.1%}")
+        if gold:
+            line += f" {agreement(predicted, gold):9.1%}"
+        print(line)
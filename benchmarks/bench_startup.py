@@ -0,0 +1,65 @@
+# benchmarks/bench_startup.py
+"""
+Measure cold start-up time of each CLI mode.
+
+Each mode is timed as a fresh interpreter that imports exactly what that
+stage needs before it would start doing real work (network or scoring),
+so the numbers reflect import and initialisation cost only.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What NewsPipeline.retrieve_data imports before its first request for the given sources.
+CRAWL_IMPORTS = ("import pipeline, collector, archive; from scrapers import get_scraper_class; "
+                 "[get_scraper_class(source) for source in {sources!r}]")
+
+MODES = {
+    "help": ["main.py", "--help"],
+    "crawl (guardian)": ["-c", CRAWL_IMPORTS.format(sources=("guardian",))],
+    "crawl (all)": ["-c", CRAWL_IMPORTS.format(sources=("guardian", "newsapi"))],
+    "score": ["-c", "from analysis import SentimentAnalyzer; SentimentAnalyzer().backend"],
+    "analyze": ["-c", "import analysis; import scipy.stats"],
+    "plot": ["-c", "import plotting"],
+}
+
+
+def time_command(args, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable] + args, cwd=ROOT,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors="replace"))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CLI start-up time benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode (default 5).")
+    args = parser.parse_args()
+
+    # Warm the lexicon cache so the score mode measures the steady state.
+    try:
+        time_command(MODES["score"], 1)
+    except RuntimeError:
+        pass
+
+    print(f"{'mode':18s} {'median (s)':>10s} {'min (s)':>8s}")
+    for name, cmd in MODES.items():
+        try:
+            timings = time_command(cmd, args.repeat)
+        except RuntimeError as e:
+            print(f"{name:18s} failed: {str(e).strip().splitlines()[-1]}")
+            continue
+        print(f"{name:18s} {statistics.median(timings):10.3f} {min(timings):8.3f}")
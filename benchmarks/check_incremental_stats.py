@@ -0,0 +1,110 @@
+# benchmarks/check_incremental_stats.py
+"""
+Check that the incremental statistics (incremental_stats.StatsState) give
+the same results as the full recomputation (SentimentAnalyzer.
+perform_statistical_tests) on synthetic scored corpora.
+
+Each case feeds the rows to a StatsState in several chunks, as successive
+analyze runs would (including the JSON round trip through the stats_state
+table between runs), and compares the results with the full path run on the
+same rows (restricted to the rolling window for windowed cases). Cases
+cover a large corpus with tied scores, small groups on either side of
+scipy's exact Mann–Whitney threshold (8 scores), and a 30-day window.
+
+Usage:
+    python benchmarks/check_incremental_stats.py [--rows 3000] [--chunks 4]
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from analysis import SentimentAnalyzer  # noqa: E402
+from config import CURRENT_DATE  # noqa: E402
+from incremental_stats import StatsState  # noqa: E402
+from sentiment_backends import label_scores  # noqa: E402
+
+# Results compared between the two paths.
+COMPARED = ("total_classified", "chi2_stat", "chi2_p", "anova_f", "anova_p", "eta_squared",
+            "mannwhitney_u", "mannwhitney_p", "cliffs_delta")
+
+
+def corpus(rng, n, days=400, decimals=4):
+    """(headline_id, date, compound_score, sentiment) rows with scores on the backends' grid."""
+    scores = np.round(np.clip(rng.normal(0.0, 0.5, n), -1, 1), decimals)
+    dates = [(CURRENT_DATE - datetime.timedelta(days=int(d))).isoformat()
+             for d in rng.integers(0, days, n)]
+    return [(i + 1, date, float(score), label)
+            for i, (date, score, label) in enumerate(zip(dates, scores, label_scores(scores)))]
+
+
+def small_groups(rng, n_positive, n_negative, n_neutral=30):
+    """Rows with exactly the given group sizes and no tied scores."""
+    scores = np.concatenate([
+        rng.choice(np.arange(500, 10001), n_positive, replace=False),
+        -rng.choice(np.arange(500, 10001), n_negative, replace=False),
+        rng.choice(np.arange(-499, 500), n_neutral, replace=False),
+    ]) / 10000
+    rng.shuffle(scores)
+    return [(i + 1, CURRENT_DATE.isoformat(), float(score), label)
+            for i, (score, label) in enumerate(zip(scores, label_scores(scores)))]
+
+
+def incremental_results(rows, window, chunks):
+    state = StatsState(window)
+    for chunk in np.array_split(np.arange(len(rows)), chunks):
+        state = StatsState.from_payload(json.loads(json.dumps(state.to_payload())))
+        state.update(rows[i] for i in chunk)
+    return SentimentAnalyzer().build_results(**state.test_statistics())
+
+
+def full_results(rows, window):
+    df = pd.DataFrame(rows, columns=["id", "date", "compound_score", "sentiment"])
+    if window is not None:
+        days = pd.to_datetime(df["date"]).map(lambda d: d.toordinal())
+        df = df[days > days.max() - window]
+    return SentimentAnalyzer().perform_statistical_tests(df)
+
+
+def mismatches(incremental, full):
+    found = []
+    for key in COMPARED:
+        a, b = float(incremental[key]), float(full[key])
+        if not np.isclose(a, b, rtol=1e-9, atol=1e-12, equal_nan=True):
+            found.append(f"{key}: incremental {a!r}, full {b!r}")
+    if not incremental["sentiment_counts"].sort_index().equals(full["sentiment_counts"].sort_index()):
+        found.append("sentiment_counts differ")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--chunks", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cases = {
+        "all rows, tied scores": (corpus(rng, args.rows), None),
+        "30-day window": (corpus(rng, args.rows), 30),
+        "2-decimal scores (heavy ties)": (corpus(rng, args.rows, decimals=2), None),
+        "8 positive vs 20 negative": (small_groups(rng, 8, 20), None),
+        "20 positive vs 8 negative": (small_groups(rng, 20, 8), None),
+        "9 positive vs 9 negative": (small_groups(rng, 9, 9), None),
+        "3 positive vs 40 negative": (small_groups(rng, 3, 40), None),
+    }
+    failed = 0
+    for name, (rows, window) in cases.items():
+        found = mismatches(incremental_results(rows, window, args.chunks), full_results(rows, window))
+        print(f"{name:32s} {'ok' if not found else 'MISMATCH'}")
+        for line in found:
+            print(f"    {line}")
+        failed += bool(found)
+    sys.exit(1 if failed else 0)
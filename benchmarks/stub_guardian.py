@@ -0,0 +1,130 @@
+# benchmarks/stub_guardian.py
+"""
+Minimal stand-in for the Guardian Content API search endpoint.
+
+Results are generated deterministically from the query, date window and
+page, so a crawl against the stub can be checked for completeness and
+duplicates without touching the real API. Run it on its own with:
+
+    python benchmarks/stub_guardian.py --port 8765
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PAGE_SIZE = 10
+
+
+def total_results(keyword, from_date, to_date):
+    """Number of results the stub reports for one keyword and date window."""
+    return zlib.crc32(f"{keyword}|{from_date}|{to_date}".encode()) % 700
+
+
+def make_result(keyword, from_date, to_date, index, show_fields=None, show_tags=None):
+    start = datetime.date.fromisoformat(from_date)
+    end = datetime.date.fromisoformat(to_date)
+    day = start + datetime.timedelta(days=index % ((end - start).days + 1))
+    article_id = f"stub/{keyword}/{from_date}/{index}"
+    result = {
+        "id": article_id,
+        "type": "article",
+        "sectionId": "technology",
+        "sectionName": "Technology",
+        "webPublicationDate": f"{day.isoformat()}T08:00:00Z",
+        "webTitle": f"{keyword} story {from_date} #{index}",
+        "webUrl": f"https://www.theguardian.com/{article_id}",
+    }
+    # Like the real API, fields and tags are only included when asked for.
+    if show_fields:
+        available = {"trailText": f"Trail text of {keyword} story #{index}", "byline": "Stub Reporter"}
+        wanted = available if show_fields == "all" else show_fields.split(",")
+        result["fields"] = {name: available[name] for name in wanted if name in available}
+    if show_tags:
+        result["tags"] = [{"id": "technology/technology", "type": "keyword", "webTitle": "Technology"}]
+    return result
+
+
+def expected_headlines(keyword, from_date, to_date):
+    """The (source, headline, date) keys a complete crawl of one window yields."""
+    keys = set()
+    for index in range(total_results(keyword, from_date, to_date)):
+        result = make_result(keyword, from_date, to_date, index)
+        keys.add(("The Guardian", result["webTitle"], result["webPublicationDate"].split("T")[0]))
+    return keys
+
+
+class StubGuardianHandler(BaseHTTPRequestHandler):
+    # Fraction of requests answered with HTTP 500, to exercise retries.
+    error_rate = 0.0
+    # Seconds each response is delayed, to mimic network round trips.
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b"stub failure")
+            return
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        keyword = params.get("q", "")
+        from_date = params.get("from-date")
+        to_date = params.get("to-date")
+        page = int(params.get("page", 1))
+        page_size = int(params.get("page-size", DEFAULT_PAGE_SIZE))
+        total = total_results(keyword, from_date, to_date)
+        pages = max(1, math.ceil(total / page_size))
+        if page > pages:
+            body = {"response": {"status": "error",
+                                 "message": "requested page is beyond the number of available pages"}}
+            status = 400
+        else:
+            first = (page - 1) * page_size
+            results = [make_result(keyword, from_date, to_date, i,
+                                   params.get("show-fields"), params.get("show-tags"))
+                       for i in range(first, min(first + page_size, total))]
+            body = {"response": {"status": "ok", "total": total, "pageSize": page_size,
+                                 "currentPage": page, "pages": pages, "results": results}}
+            status = 200
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, error_rate=0.0, latency=0.0):
+    """
+    Start the stub in a background thread. Returns (server, base_url); call
+    server.shutdown() to stop it.
+    """
+    handler = type("Handler", (StubGuardianHandler,), {"error_rate": error_rate, "latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Guardian search API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.error_rate, args.latency)
+    print(f"Stub Guardian API listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
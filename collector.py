@@ -0,0 +1,108 @@
+# collector.py
+import queue
+import threading
+import time
+
+# Marker a source worker puts on the queue when its scraper is exhausted.
+_SOURCE_DONE = object()
+
+
+class SourceReport:
+    """Running throughput counters for one source."""
+    def __init__(self, name):
+        self.name = name
+        self.pages = 0
+        self.articles = 0
+        self.new_headlines = 0
+        self.archived = 0
+        self.started = time.perf_counter()
+        self.finished = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def articles_per_second(self):
+        return self.articles / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class MultiSourceCollector:
+    """
+    Run several scrapers at once and merge their result streams.
+
+    Each scraper runs in its own thread, rate-limited by its own
+    request_interval, and pushes result pages onto a bounded queue. The
+    calling thread is the single writer: it parses each page, drops headlines
+    already seen during the run, and upserts the rest into the database, so
+    only one thread ever touches the SQLite connection. With an archive
+    (archive.RawArticleArchive), the writer also stores each page's raw
+    results there before parsing them.
+    """
+    def __init__(self, scrapers, db, archive=None, max_pending_pages=64):
+        self.scrapers = scrapers
+        self.db = db
+        self.archive = archive
+        self.pages = queue.Queue(maxsize=max_pending_pages)
+        self.reports = {scraper.source_name: SourceReport(scraper.source_name) for scraper in scrapers}
+
+    def _run_source(self, scraper):
+        report = self.reports[scraper.source_name]
+        try:
+            for _, _, articles in scraper.iter_pages():
+                self.pages.put((scraper, articles))
+        except Exception as e:
+            report.error = e
+            print(f"Source '{scraper.source_name}' stopped with an error: {e}")
+        finally:
+            self.pages.put((scraper, _SOURCE_DONE))
+
+    def run(self):
+        """
+        Collect from every source until all are exhausted.
+        Returns the per-source reports, keyed by source name.
+        """
+        threads = [
+            threading.Thread(target=self._run_source, args=(scraper,),
+                             name=f"scraper-{scraper.source_name}", daemon=True)
+            for scraper in self.scrapers
+        ]
+        for thread in threads:
+            thread.start()
+
+        seen = set()
+        running = len(threads)
+        while running:
+            scraper, articles = self.pages.get()
+            report = self.reports[scraper.source_name]
+            if articles is _SOURCE_DONE:
+                report.finished = time.perf_counter()
+                running -= 1
+                continue
+            if self.archive is not None:
+                report.archived += self.archive.append(
+                    scraper.source_name, ((scraper.article_id(art), art) for art in articles))
+            headlines = []
+            for art in articles:
+                record = scraper.parse_article(art)
+                if record not in seen:
+                    seen.add(record)
+                    headlines.append(record)
+            report.pages += 1
+            report.articles += len(articles)
+            report.new_headlines += self.db.upsert_headlines(headlines)
+
+        for thread in threads:
+            thread.join()
+        self.print_report()
+        return self.reports
+
+    def print_report(self):
+        print("\nCollection report:")
+        print(f"  {'source':10s} {'pages':>6s} {'articles':>9s} {'new':>7s} {'archived':>9s} "
+              f"{'seconds':>8s} {'articles/s':>11s}")
+        for report in self.reports.values():
+            status = f"  (error: {report.error})" if report.error else ""
+            print(f"  {report.name:10s} {report.pages:6d} {report.articles:9d} {report.new_headlines:7d} "
+                  f"{report.archived:9d} {report.elapsed:8.1f} {report.articles_per_second:11.1f}{status}")
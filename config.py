@@ -111,20 +111,74 @@ NEWSAPI_CONFIG = {
     "page_size": 100,
     # Remove the fixed max_pages limit—instead, we'll loop until no articles are returned.
     # "max_pages": 3,
-    "days_range": 5 * 365  # Last 5 years in days.
+    "days_range": 5 * 365,  # Last 5 years in days.
+    "request_interval": 0.5  # Minimum seconds between two requests.
 }
 
 # Configuration for Guardian scraper.
 # (This mode uses the official Guardian API exclusively—not web scraping.)
 GUARDIAN_CONFIG = {
     "base_url": "https://content.guardianapis.com/search",
+    # Extra data requested with every result and kept in the raw archive; the
+    # search API returns only id, section, URL, title and date without them.
+    "show_fields": "trailText,byline",
+    "show_tags": "all",
     # "max_pages": 3,
-    "days_range": 5 * 365
+    "days_range": 5 * 365,
+    "request_interval": 0.5  # Minimum seconds between two requests.
+}
+
+# Configuration for the shared crawl work queue (crawl --queue / worker).
+# Tasks are keyword x date-window x page-range slices of the Guardian search.
+CRAWL_QUEUE_CONFIG = {
+    "window_days": 90,       # Length of each task's date window.
+    "pages_per_task": 5,     # Pages fetched per task before a follow-up task is queued.
+    "page_size": 200,        # Guardian results per page (API maximum).
+    "lease_seconds": 120,    # A task whose lease is not renewed within this time is reclaimed.
+    "max_attempts": 5,       # Tasks failing this many times are marked failed.
+    "retry_delay": 30,       # Seconds before a failed task is retried; doubles with every attempt...
+    "max_retry_delay": 1800, # ...up to this many seconds.
+    "poll_interval": 5,      # Seconds an idle worker waits before polling again.
+    "page_delay": 0.5        # Pause between page requests, as in the sequential crawler.
 }
 
 # Database configuration.
 DB_NAME = "headlines.db"
 
+# Sentiment scoring: headlines per backend batch, and the trained TF-IDF model.
+SENTIMENT_BATCH_SIZE = 1024
+SENTIMENT_MODEL_PATH = "models/tfidf_linear.npz"
+
+# Plot stage: per-source charts are drawn for the largest sources only, and
+# headless rendering uses this many worker processes (None = one per CPU).
+PLOT_CONFIG = {
+    "top_sources": 20,
+    "workers": None
+}
+
+# Per-subgroup permutation tests (analyze --by source|month, see permutation_tests.py).
+PERMUTATION_CONFIG = {
+    "seed": 20250414,           # Base seed; each subgroup and test derives its own stream from it.
+    "batch_size": 1000,         # Relabellings drawn per vectorised batch.
+    "max_permutations": 20000,  # Upper bound per test; fewer are used once the p-value is settled.
+    "alpha": 0.05,              # Sampling stops once p is known to be above or below alpha...
+    "confidence": 0.99,         # ...with this confidence (Clopper–Pearson interval).
+    "exact_limit": 20000,       # Enumerate every outcome when there are at most this many.
+    "max_batch_cells": 4000000, # Cap on a batch's permutation matrix (rows x subgroup size).
+    "workers": None             # Worker processes (None = one per CPU).
+}
+
+# Archive of the raw API results seen while crawling (see archive.py).
+ARCHIVE_CONFIG = {
+    "enabled": True,
+    "directory": None,   # None = a raw_archive/ directory next to the database.
+    "codec": "zstd",     # Falls back to zlib when the zstandard package is not installed.
+    "level": 3
+}
+
+# Pre-parsed VADER lexicon (built from the local NLTK data on first use).
+VADER_LEXICON_CACHE = "vader_lexicon.pkl"
+
 # HTTP Headers for requests.
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
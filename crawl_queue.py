@@ -0,0 +1,351 @@
+# crawl_queue.py
+import datetime
+import os
+import socket
+import sqlite3
+import time
+
+from config import ARCHIVE_CONFIG, CRAWL_QUEUE_CONFIG, GUARDIAN_API_KEYS, GUARDIAN_CONFIG
+from database import DatabaseManager
+
+TASK_PENDING = "pending"
+TASK_LEASED = "leased"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+
+def split_date_range(from_date, to_date, window_days):
+    """
+    Split [from_date, to_date] into consecutive, non-overlapping windows of
+    at most window_days days. Returns a list of (start, end) date pairs.
+    """
+    windows = []
+    start = from_date
+    while start <= to_date:
+        end = min(start + datetime.timedelta(days=window_days - 1), to_date)
+        windows.append((start, end))
+        start = end + datetime.timedelta(days=1)
+    return windows
+
+
+class CrawlQueue:
+    """
+    Work queue of crawl tasks stored in the crawl_tasks table of a SQLite
+    database. Each task is a keyword x date-window x page-range slice of the
+    Guardian search. Workers claim tasks under a time-limited lease, renew it
+    with heartbeats while fetching, and mark the task done when finished; a
+    task whose lease expires is handed to the next worker that asks. A task
+    that fails is retried after a delay that doubles with every attempt.
+
+    Claims run inside BEGIN IMMEDIATE transactions, so any number of worker
+    processes (on one host, or on several hosts sharing the database file)
+    can use the same queue. Leases use wall-clock time, so hosts sharing a
+    queue need synchronised clocks.
+    """
+    def __init__(self, db_name, lease_seconds=CRAWL_QUEUE_CONFIG["lease_seconds"],
+                 max_attempts=CRAWL_QUEUE_CONFIG["max_attempts"],
+                 retry_delay=CRAWL_QUEUE_CONFIG["retry_delay"],
+                 max_retry_delay=CRAWL_QUEUE_CONFIG["max_retry_delay"], timeout=60):
+        self.db_name = db_name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # Autocommit mode: transactions are opened explicitly where needed.
+        self.conn = sqlite3.connect(db_name, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.initialize()
+
+    def initialize(self):
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                keyword TEXT NOT NULL,
+                from_date TEXT NOT NULL,
+                to_date TEXT NOT NULL,
+                page_start INTEGER NOT NULL,
+                page_end INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker_id TEXT,
+                lease_expires REAL,
+                heartbeat_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                retry_at REAL,
+                completed_at REAL,
+                UNIQUE (keyword, from_date, to_date, page_start)
+            )
+        ''')
+        # Queues created before failed tasks were retried with a delay lack retry_at.
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(crawl_tasks)")}
+        if "retry_at" not in columns:
+            self.conn.execute("ALTER TABLE crawl_tasks ADD COLUMN retry_at REAL")
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_crawl_tasks_status
+            ON crawl_tasks (status, lease_expires)
+        ''')
+
+    def _insert_task(self, keyword, from_date, to_date, page_start, page_end):
+        cursor = self.conn.execute('''
+            INSERT OR IGNORE INTO crawl_tasks (keyword, from_date, to_date, page_start, page_end)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (keyword, from_date, to_date, page_start, page_end))
+        return cursor.rowcount
+
+    def seed(self, keywords, from_date, to_date,
+             window_days=CRAWL_QUEUE_CONFIG["window_days"],
+             pages_per_task=CRAWL_QUEUE_CONFIG["pages_per_task"]):
+        """
+        Queue the first page range of every keyword x date window. Seeding is
+        idempotent: tasks that already exist are left alone. Further page
+        ranges are queued by the workers as they discover more results.
+        Returns the number of tasks added.
+        """
+        added = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for keyword in keywords:
+                for start, end in split_date_range(from_date, to_date, window_days):
+                    added += self._insert_task(keyword, start.isoformat(), end.isoformat(),
+                                               1, pages_per_task)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def retry_failed(self):
+        """
+        Give failed tasks a fresh set of attempts and drop the retry delays of
+        pending tasks, so a new crawl retries everything that is not done.
+        Returns the number of failed tasks queued again.
+        """
+        cursor = self.conn.execute('''
+            UPDATE crawl_tasks SET status = ?, attempts = 0, retry_at = NULL
+            WHERE status = ?
+        ''', (TASK_PENDING, TASK_FAILED))
+        self.conn.execute("UPDATE crawl_tasks SET retry_at = NULL WHERE status = ?", (TASK_PENDING,))
+        return cursor.rowcount
+
+    def claim(self, worker_id):
+        """
+        Atomically lease the oldest pending task whose retry delay has passed,
+        or a leased task whose lease has expired. Returns the task as a dict,
+        or None if nothing is claimable.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Tasks whose final attempt died with the lease held are given up on.
+            self.conn.execute('''
+                UPDATE crawl_tasks SET status = ?, last_error = 'lease expired'
+                WHERE status = ? AND lease_expires < ? AND attempts >= ?
+            ''', (TASK_FAILED, TASK_LEASED, now, self.max_attempts))
+            row = self.conn.execute('''
+                SELECT * FROM crawl_tasks
+                WHERE attempts < ?
+                  AND ((status = ? AND (retry_at IS NULL OR retry_at <= ?))
+                       OR (status = ? AND lease_expires < ?))
+                ORDER BY id
+                LIMIT 1
+            ''', (self.max_attempts, TASK_PENDING, now, TASK_LEASED, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            if row["status"] == TASK_LEASED:
+                print(f"Reclaiming task {row['id']} from worker {row['worker_id']} (lease expired).")
+            self.conn.execute('''
+                UPDATE crawl_tasks
+                SET status = ?, worker_id = ?, lease_expires = ?, heartbeat_at = ?,
+                    attempts = attempts + 1
+                WHERE id = ?
+            ''', (TASK_LEASED, worker_id, now + self.lease_seconds, now, row["id"]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        task = dict(row)
+        task["worker_id"] = worker_id
+        task["attempts"] += 1
+        return task
+
+    def heartbeat(self, task_id, worker_id):
+        """
+        Extend the lease on a task. Returns False if the worker no longer holds
+        the lease (it expired and another worker reclaimed the task).
+        """
+        now = time.time()
+        cursor = self.conn.execute('''
+            UPDATE crawl_tasks SET lease_expires = ?, heartbeat_at = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+        ''', (now + self.lease_seconds, now, task_id, worker_id, TASK_LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, task, next_page=None, pages_per_task=CRAWL_QUEUE_CONFIG["pages_per_task"]):
+        """
+        Mark a task done. If next_page is given, the slice has more results and
+        a follow-up task starting at that page is queued in the same transaction.
+        Returns False if the worker had lost the lease.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute('''
+                UPDATE crawl_tasks
+                SET status = ?, completed_at = ?, lease_expires = NULL
+                WHERE id = ? AND worker_id = ? AND status = ?
+            ''', (TASK_DONE, time.time(), task["id"], task["worker_id"], TASK_LEASED))
+            completed = cursor.rowcount == 1
+            if completed and next_page is not None:
+                self._insert_task(task["keyword"], task["from_date"], task["to_date"],
+                                  next_page, next_page + pages_per_task - 1)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return completed
+
+    def fail(self, task, error):
+        """
+        Give a task back after an error. It can be claimed again once its
+        retry delay has passed (retry_delay, doubling with every attempt up to
+        max_retry_delay), until it has been attempted max_attempts times,
+        after which it is marked failed.
+        """
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (task["attempts"] - 1))
+        self.conn.execute('''
+            UPDATE crawl_tasks
+            SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                worker_id = NULL, lease_expires = NULL, last_error = ?, retry_at = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+        ''', (self.max_attempts, TASK_FAILED, TASK_PENDING, str(error), time.time() + delay,
+              task["id"], task["worker_id"], TASK_LEASED))
+
+    def release(self, task, error):
+        """
+        Give a task back without using up an attempt, after an error that is
+        not the task's fault (every API key is rate limited).
+        """
+        self.conn.execute('''
+            UPDATE crawl_tasks
+            SET status = ?, attempts = attempts - 1, worker_id = NULL, lease_expires = NULL,
+                last_error = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+        ''', (TASK_PENDING, str(error), task["id"], task["worker_id"], TASK_LEASED))
+
+    def clear(self):
+        """Delete every task, so the next seed queues the whole crawl again."""
+        self.conn.execute("DELETE FROM crawl_tasks")
+
+    def finished_keywords(self):
+        """Keywords that have tasks and whose tasks are all done."""
+        rows = self.conn.execute('''
+            SELECT keyword FROM crawl_tasks
+            GROUP BY keyword
+            HAVING SUM(status != ?) = 0
+        ''', (TASK_DONE,))
+        return {row[0] for row in rows}
+
+    def status_counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM crawl_tasks GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def is_drained(self):
+        """True when no task is pending or leased (everything is done or failed)."""
+        row = self.conn.execute('''
+            SELECT COUNT(*) FROM crawl_tasks
+            WHERE (status = ? AND attempts < ?) OR status = ?
+        ''', (TASK_PENDING, self.max_attempts, TASK_LEASED)).fetchone()
+        return row[0] == 0
+
+    def close(self):
+        self.conn.close()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(db_name, worker_id=None, api_keys=GUARDIAN_API_KEYS,
+               base_url=GUARDIAN_CONFIG["base_url"],
+               lease_seconds=CRAWL_QUEUE_CONFIG["lease_seconds"],
+               retry_delay=CRAWL_QUEUE_CONFIG["retry_delay"],
+               poll_interval=CRAWL_QUEUE_CONFIG["poll_interval"],
+               page_delay=CRAWL_QUEUE_CONFIG["page_delay"],
+               page_size=CRAWL_QUEUE_CONFIG["page_size"],
+               exit_when_drained=True, archive=ARCHIVE_CONFIG["enabled"]):
+    """
+    Claim and process crawl tasks until the queue is drained (or forever if
+    exit_when_drained is False). Headlines are upserted into the headlines
+    table of the same database, so a task that is processed twice (after a
+    lease expired) does not create duplicates. With archive=True the raw
+    results are also added to the raw archive next to the database, which
+    workers share safely. Once every API key is rate limited the worker gives
+    its task back and stops. Returns the number of tasks this worker completed.
+    """
+    from scrapers.guardian_scraper import GuardianScraper
+
+    worker_id = worker_id or default_worker_id()
+    queue = CrawlQueue(db_name, lease_seconds=lease_seconds, retry_delay=retry_delay)
+    db = DatabaseManager(db_name)
+    db.initialize_database()
+    raw_archive = None
+    if archive:
+        from archive import RawArticleArchive, archive_directory
+        raw_archive = RawArticleArchive(archive_directory(db_name))
+    # The scraper's own throttle spaces out page requests by page_delay.
+    scraper = GuardianScraper(api_keys, None, None, [], page_size=page_size, base_url=base_url,
+                              request_interval=page_delay)
+    completed = 0
+    try:
+        while True:
+            task = queue.claim(worker_id)
+            if task is None:
+                if exit_when_drained and queue.is_drained():
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            keyword = task["keyword"]
+            from_date = datetime.date.fromisoformat(task["from_date"])
+            to_date = datetime.date.fromisoformat(task["to_date"])
+            next_page = None
+            error = None
+            for page in range(task["page_start"], task["page_end"] + 1):
+                data = scraper.fetch_page(keyword, page, from_date, to_date, page_size=page_size)
+                if data is None:
+                    error = f"page {page} could not be fetched"
+                    break
+                articles = data.get("results", [])
+                if raw_archive is not None:
+                    raw_archive.append(scraper.source_name,
+                                       ((scraper.article_id(art), art) for art in articles))
+                inserted = db.upsert_headlines(scraper.parse_article(art) for art in articles)
+                print(f"[{worker_id}] '{keyword}' {task['from_date']}..{task['to_date']} "
+                      f"page {page}: {len(articles)} articles, {inserted} new.")
+                if not queue.heartbeat(task["id"], worker_id):
+                    error = "lease lost"
+                    break
+                if not articles or page >= data.get("pages", page):
+                    break
+                if page == task["page_end"]:
+                    next_page = page + 1
+
+            if error == "lease lost":
+                print(f"[{worker_id}] Lost the lease on task {task['id']}; abandoning it.")
+            elif scraper.keys_exhausted:
+                # Every task would fail the same way until the quota resets.
+                print(f"[{worker_id}] Every API key is rate limited; giving back task {task['id']} and stopping.")
+                queue.release(task, "API keys rate limited")
+                break
+            elif error is not None:
+                print(f"[{worker_id}] Task {task['id']} failed: {error}")
+                queue.fail(task, error)
+            elif queue.complete(task, next_page):
+                completed += 1
+    finally:
+        if raw_archive is not None:
+            raw_archive.close()
+        db.close()
+        queue.close()
+    print(f"[{worker_id}] Finished after completing {completed} tasks.")
+    return completed
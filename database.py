@@ -1,14 +1,17 @@
 # database.py
+import hashlib
+import json
 import sqlite3
-import pandas as pd
 
 class DatabaseManager:
-    def __init__(self, db_name="headlines.db"):
+    def __init__(self, db_name="headlines.db", timeout=30):
         self.db_name = db_name
+        # Seconds to wait on a locked database (several crawl workers may write at once).
+        self.timeout = timeout
         self.conn = None
 
     def initialize_database(self):
-        self.conn = sqlite3.connect(self.db_name)
+        self.conn = sqlite3.connect(self.db_name, timeout=self.timeout)
         cursor = self.conn.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS headlines (
@@ -19,18 +22,59 @@ class DatabaseManager:
                 accessible INTEGER
             )
         ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_headlines_key
+            ON headlines (source, headline, date)
+        ''')
+        # Per-headline sentiment scores written by the score stage.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scores (
+                headline_id INTEGER PRIMARY KEY,
+                compound_score REAL,
+                sentiment TEXT
+            )
+        ''')
+        # Versioned stage outputs, keyed by the content hash of their inputs.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS artifacts (
+                name TEXT PRIMARY KEY,
+                version INTEGER,
+                input_hash TEXT,
+                payload TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        # Persisted incremental statistics (incremental_stats.StatsState), one per window.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_state (
+                name TEXT PRIMARY KEY,
+                payload TEXT
+            )
+        ''')
         self.conn.commit()
 
-    def store_headlines(self, headlines):
+    def upsert_headlines(self, headlines):
+        """
+        Insert only the records.HeadlineRecord objects whose (source, headline,
+        date) is not stored yet. Existing rows keep their ids, so their scores
+        stay valid. Returns the number of rows inserted.
+        """
         cursor = self.conn.cursor()
-        for entry in headlines:
-            cursor.execute('''
-                INSERT INTO headlines (source, headline, date, accessible)
-                VALUES (?, ?, ?, ?)
-            ''', (entry['source'], entry['headline'], entry['date'], int(entry['accessible'])))
+        cursor.executemany('''
+            INSERT INTO headlines (source, headline, date, accessible)
+            SELECT ?1, ?2, ?3, ?4
+            WHERE NOT EXISTS (
+                SELECT 1 FROM headlines
+                WHERE source = ?1 AND headline = ?2 AND date IS ?3
+            )
+        ''', (record.row() for record in headlines))
+        # executemany adds up the rows changed by every statement.
+        inserted = max(cursor.rowcount, 0)
         self.conn.commit()
+        return inserted
 
     def load_headlines(self):
+        import pandas as pd
         query = "SELECT * FROM headlines"
         df = pd.read_sql_query(query, self.conn)
         return df
@@ -41,9 +85,169 @@ class DatabaseManager:
         count = cursor.fetchone()[0]
         return count > 0
 
+    def count_headlines(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM headlines")
+        return cursor.fetchone()[0]
+
     def clear_headlines(self):
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM headlines")
+        cursor.execute("DELETE FROM scores")
+        self.conn.commit()
+
+    def load_unscored_headlines(self):
+        import pandas as pd
+        query = '''
+            SELECT h.* FROM headlines h
+            LEFT JOIN scores s ON s.headline_id = h.id
+            WHERE s.headline_id IS NULL
+        '''
+        return pd.read_sql_query(query, self.conn)
+
+    def store_scores(self, rows):
+        """
+        Store (headline_id, compound_score, sentiment) tuples, replacing any
+        existing score for the same headline.
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO scores (headline_id, compound_score, sentiment)
+            VALUES (?, ?, ?)
+        ''', rows)
+        self.conn.commit()
+
+    def clear_scores(self):
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM scores")
+        self.conn.commit()
+
+    def load_scored_headlines(self):
+        import pandas as pd
+        query = '''
+            SELECT h.*, s.compound_score, s.sentiment FROM headlines h
+            JOIN scores s ON s.headline_id = h.id
+            ORDER BY h.id
+        '''
+        return pd.read_sql_query(query, self.conn)
+
+    def load_scored_rows_after(self, headline_id):
+        """
+        Yield (headline_id, date, compound_score, sentiment) for every scored
+        headline with an id greater than headline_id, in id order.
+        """
+        return self.conn.execute('''
+            SELECT h.id, h.date, s.compound_score, s.sentiment FROM scores s
+            JOIN headlines h ON h.id = s.headline_id
+            WHERE s.headline_id > ?
+            ORDER BY s.headline_id
+        ''', (headline_id,))
+
+    def count_scores_up_to(self, headline_id):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM scores WHERE headline_id <= ?", (headline_id,))
+        return cursor.fetchone()[0]
+
+    def load_stats_state(self, name):
+        """
+        Return the decoded payload of a persisted incremental statistics state
+        (incremental_stats.StatsState.to_payload), or None if there is none.
+        States in an older, non-JSON format also give None, so they are rebuilt.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT payload FROM stats_state WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def save_stats_state(self, name, payload):
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT OR REPLACE INTO stats_state (name, payload) VALUES (?, ?)",
+                       (name, json.dumps(payload)))
+        self.conn.commit()
+
+    def _sentiment_counts_by(self, group_expr):
+        counts = {}
+        rows = self.conn.execute(f'''
+            SELECT {group_expr} AS grp, s.sentiment, COUNT(*) FROM headlines h
+            JOIN scores s ON s.headline_id = h.id
+            WHERE s.sentiment IS NOT NULL AND {group_expr} IS NOT NULL
+            GROUP BY grp, s.sentiment
+        ''')
+        for group, sentiment, count in rows:
+            counts.setdefault(group, {})[sentiment] = count
+        return counts
+
+    def sentiment_counts_by_source(self):
+        """Return {source: {sentiment: count}} for the scored headlines."""
+        return self._sentiment_counts_by("h.source")
+
+    def sentiment_counts_by_month(self):
+        """Return {"YYYY-MM": {sentiment: count}} for the scored headlines."""
+        return self._sentiment_counts_by("substr(h.date, 1, 7)")
+
+    def _scored_rows_by(self, group_expr):
+        return self.conn.execute(f'''
+            SELECT {group_expr} AS grp, s.compound_score, s.sentiment FROM headlines h
+            JOIN scores s ON s.headline_id = h.id
+            WHERE s.sentiment IS NOT NULL AND {group_expr} IS NOT NULL
+            ORDER BY grp, h.id
+        ''')
+
+    def scored_rows_by_source(self):
+        """Yield (source, compound_score, sentiment) for the scored headlines, ordered by source."""
+        return self._scored_rows_by("h.source")
+
+    def scored_rows_by_month(self):
+        """Yield ("YYYY-MM", compound_score, sentiment) for the scored headlines, ordered by month."""
+        return self._scored_rows_by("substr(h.date, 1, 7)")
+
+    def _hash_query(self, query):
+        digest = hashlib.sha256()
+        for row in self.conn.execute(query):
+            digest.update(repr(row).encode("utf-8"))
+        return digest.hexdigest()
+
+    def headlines_hash(self):
+        """Content hash of every stored headline (the input of the score stage)."""
+        return self._hash_query("SELECT id, source, headline, date FROM headlines ORDER BY id")
+
+    def scores_hash(self):
+        """Content hash of the scored corpus (the input of the analyze stage)."""
+        return self._hash_query('''
+            SELECT h.id, h.source, h.date, s.compound_score, s.sentiment FROM headlines h
+            JOIN scores s ON s.headline_id = h.id
+            ORDER BY h.id
+        ''')
+
+    def get_artifact(self, name):
+        """
+        Return the stored artifact as a dict with version, input_hash and the
+        decoded payload, or None if the stage has never run.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT version, input_hash, payload FROM artifacts WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {"version": row[0], "input_hash": row[1], "payload": json.loads(row[2])}
+
+    def save_artifact(self, name, version, input_hash, payload):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO artifacts (name, version, input_hash, payload, created_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', (name, version, input_hash, json.dumps(payload)))
+        self.conn.commit()
+
+    def clear_artifacts(self):
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM artifacts")
+        cursor.execute("DELETE FROM stats_state")
         self.conn.commit()
 
     def close(self):
@@ -0,0 +1,234 @@
+# incremental_stats.py
+import datetime
+from collections import Counter
+from fractions import Fraction
+
+import numpy as np
+
+GROUPS = ("positive", "negative", "neutral")
+
+# Every sentiment backend rounds compound scores to 4 decimals, so scores are
+# kept as integer keys on that grid. Histograms and moments are then exact,
+# and rank statistics can be computed from the histograms alone.
+SCALE = 10000
+
+
+class GroupSummary:
+    """Count, sum, sum of squares and histogram of one group's score keys."""
+    __slots__ = ("n", "total", "total_sq", "histogram")
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+        self.histogram = Counter()
+
+    def add(self, key, count=1):
+        self.n += count
+        self.total += key * count
+        self.total_sq += key * key * count
+        self.histogram[key] += count
+
+    def remove(self, key, count=1):
+        self.n -= count
+        self.total -= key * count
+        self.total_sq -= key * key * count
+        self.histogram[key] -= count
+        if not self.histogram[key]:
+            del self.histogram[key]
+
+
+def _histogram_to_payload(histogram):
+    return {str(key): count for key, count in histogram.items()}
+
+
+def _histogram_from_payload(histogram):
+    return Counter({int(key): count for key, count in histogram.items()})
+
+
+class StatsState:
+    """
+    Persistable summary of the scored corpus from which the chi-square,
+    ANOVA, Mann–Whitney U and Cliff's delta results can be recomputed
+    without reading every headline.
+
+    The state is updated from newly scored rows only (tracked by the highest
+    headline id seen). With window_days set, rows are also bucketed per day
+    and buckets older than window_days before the newest headline date are
+    evicted, giving a rolling window; rows without a date are then ignored.
+    """
+    def __init__(self, window_days=None):
+        self.window_days = window_days
+        # Scores generation this state was built from (see NewsPipeline.score).
+        self.generation = None
+        self.last_headline_id = 0
+        self.rows_seen = 0
+        self.groups = {group: GroupSummary() for group in GROUPS}
+        self.days = {}  # date ordinal -> {group: Counter(score key -> count)}
+        self.latest_day = None
+
+    def to_payload(self):
+        """
+        JSON-serialisable form of the state, as stored in the stats_state
+        table. Histograms are kept as {score key: count}; JSON object keys are
+        strings, so score keys and day ordinals are written as strings.
+        """
+        return {
+            "window_days": self.window_days,
+            "generation": self.generation,
+            "last_headline_id": self.last_headline_id,
+            "rows_seen": self.rows_seen,
+            "latest_day": self.latest_day,
+            "groups": {group: _histogram_to_payload(summary.histogram)
+                       for group, summary in self.groups.items()},
+            "days": {str(day): {group: _histogram_to_payload(histogram)
+                                for group, histogram in histograms.items()}
+                     for day, histograms in self.days.items()},
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Rebuild a state from to_payload() output; moments are recomputed from the histograms."""
+        state = cls(payload["window_days"])
+        state.generation = payload["generation"]
+        state.last_headline_id = payload["last_headline_id"]
+        state.rows_seen = payload["rows_seen"]
+        state.latest_day = payload["latest_day"]
+        for group, histogram in payload["groups"].items():
+            summary = state.groups[group]
+            for key, count in _histogram_from_payload(histogram).items():
+                summary.add(key, count)
+        state.days = {int(day): {group: _histogram_from_payload(histogram)
+                                 for group, histogram in histograms.items()}
+                      for day, histograms in payload["days"].items()}
+        return state
+
+    def update(self, rows):
+        """
+        Add scored rows given as (headline_id, date, compound_score, sentiment)
+        tuples with ids greater than last_headline_id. Returns the number of rows read.
+        """
+        read = 0
+        for headline_id, date, score, sentiment in rows:
+            read += 1
+            self.last_headline_id = max(self.last_headline_id, headline_id)
+            if sentiment not in self.groups or score is None:
+                continue
+            key = int(round(score * SCALE))
+            if self.window_days is not None:
+                if not date:
+                    continue
+                day = datetime.date.fromisoformat(date[:10]).toordinal()
+                if self.latest_day is not None and day <= self.latest_day - self.window_days:
+                    continue  # Already outside the window.
+                self.days.setdefault(day, {}).setdefault(sentiment, Counter())[key] += 1
+                if self.latest_day is None or day > self.latest_day:
+                    self.latest_day = day
+            self.groups[sentiment].add(key)
+        self.rows_seen += read
+        if self.window_days is not None:
+            self.evict()
+        return read
+
+    def evict(self):
+        """Drop day buckets that have fallen out of the rolling window."""
+        if self.latest_day is None:
+            return
+        cutoff = self.latest_day - self.window_days
+        for day in [day for day in self.days if day <= cutoff]:
+            for group, histogram in self.days.pop(day).items():
+                for key, count in histogram.items():
+                    self.groups[group].remove(key, count)
+
+    def sentiment_counts(self):
+        import pandas as pd
+        counts = {group: summary.n for group, summary in self.groups.items() if summary.n}
+        return pd.Series(counts, dtype="int64").sort_values(ascending=False)
+
+    def _anova(self):
+        from scipy.stats import f as f_dist
+
+        summaries = list(self.groups.values())
+        n_total = sum(s.n for s in summaries)
+        k = len(summaries)
+        if any(s.n == 0 for s in summaries) or n_total <= k:
+            return np.nan, np.nan, np.nan
+        # Exact sums of squares on the integer grid.
+        grand_total = sum(s.total for s in summaries)
+        between_part = sum(Fraction(s.total * s.total, s.n) for s in summaries)
+        ss_between = between_part - Fraction(grand_total * grand_total, n_total)
+        ss_within = sum(s.total_sq for s in summaries) - between_part
+        ss_total = ss_between + ss_within
+        eta_sq = float(ss_between / ss_total) if ss_total else np.nan
+        if ss_within == 0:
+            return np.inf if ss_between else np.nan, 0.0 if ss_between else np.nan, eta_sq
+        f_stat = float((ss_between / (k - 1)) / (ss_within / (n_total - k)))
+        return f_stat, float(f_dist.sf(f_stat, k - 1, n_total - k)), eta_sq
+
+    def _mann_whitney(self, first="positive", second="negative"):
+        """
+        Mann–Whitney U (statistic of the first group), its two-sided p-value
+        and Cliff's delta, computed from the two histograms.
+        """
+        from scipy.stats import mannwhitneyu, norm
+
+        hist_1 = self.groups[first].histogram
+        hist_2 = self.groups[second].histogram
+        n1, n2 = self.groups[first].n, self.groups[second].n
+        if not n1 or not n2:
+            return np.nan, np.nan, 0
+        # Twice U1: pairs where x > y count 2, ties count 1.
+        twice_u = 0
+        below = 0
+        tie_term = 0
+        for key in sorted(set(hist_1) | set(hist_2)):
+            c1, c2 = hist_1.get(key, 0), hist_2.get(key, 0)
+            twice_u += c1 * (2 * below + c2)
+            below += c2
+            t = c1 + c2
+            tie_term += t ** 3 - t
+        u1 = twice_u / 2
+        cliffs_delta = (twice_u - n1 * n2) / (n1 * n2)
+
+        if min(n1, n2) <= 8:
+            # Small samples: let scipy choose its method (exact when either group has
+            # at most 8 scores and there are no ties), as the full path does.
+            x = np.repeat(np.array(list(hist_1), dtype=float), list(hist_1.values())) / SCALE
+            y = np.repeat(np.array(list(hist_2), dtype=float), list(hist_2.values())) / SCALE
+            _, p = mannwhitneyu(x, y, alternative="two-sided")
+            return u1, float(p), cliffs_delta
+
+        # Normal approximation with tie and continuity correction (scipy's asymptotic method).
+        n = n1 + n2
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        if sigma == 0:
+            return u1, np.nan, cliffs_delta
+        u = max(u1, n1 * n2 - u1)
+        z = (u - n1 * n2 / 2 - 0.5) / sigma
+        return u1, float(min(2 * norm.sf(z), 1.0)), cliffs_delta
+
+    def test_statistics(self):
+        """
+        Raw test results in the form SentimentAnalyzer.build_results expects.
+        """
+        from scipy.stats import chi2
+
+        sentiment_counts = self.sentiment_counts()
+        total_classified = sentiment_counts.sum()
+        observed = sentiment_counts.reindex(list(GROUPS), fill_value=0).values
+        expected = np.array([total_classified / 3] * 3)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chi2_stat = ((observed - expected) ** 2 / expected).sum()
+        f_stat, anova_p, eta_sq = self._anova()
+        mwu_stat, mwu_p, cliffs_delta = self._mann_whitney()
+        return {
+            "sentiment_counts": sentiment_counts,
+            "chi2_stat": chi2_stat,
+            "chi2_p": chi2.sf(chi2_stat, df=2),
+            "f_stat": f_stat,
+            "anova_p": anova_p,
+            "eta_sq": eta_sq,
+            "mwu_stat": mwu_stat,
+            "mwu_p": mwu_p,
+            "raw_cliffs_d": cliffs_delta,
+        }
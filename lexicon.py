@@ -0,0 +1,71 @@
+# lexicon.py
+import os
+import pickle
+from array import array
+
+from config import VADER_LEXICON_CACHE
+
+# Bump when the cache layout changes so stale caches are rebuilt.
+CACHE_FORMAT_VERSION = 1
+
+
+def _read_lexicon_text():
+    """
+    Return the raw VADER lexicon text from the local NLTK data directory.
+    The lexicon is only downloaded if NLTK cannot find it locally.
+    """
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
+    # Use the same resource path NLTK's own analyzer defaults to.
+    resource = SentimentIntensityAnalyzer.__init__.__defaults__[0]
+    return nltk.data.load(resource, format="text")
+
+
+def parse_lexicon(text):
+    """
+    Parse the tab-separated VADER lexicon into a sorted tuple of words and a
+    parallel array of valences (the same fields NLTK's make_lex_dict reads).
+    """
+    entries = {}
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        word, measure = line.strip().split("\t")[0:2]
+        entries[word] = float(measure)
+    words = tuple(sorted(entries))
+    valences = array("d", (entries[w] for w in words))
+    return words, valences
+
+
+def build_lexicon_cache(cache_path=VADER_LEXICON_CACHE):
+    """
+    Parse the VADER lexicon once and pickle it in its compact form.
+    Returns the lexicon as a dict mapping word -> valence.
+    """
+    words, valences = parse_lexicon(_read_lexicon_text())
+    payload = {"version": CACHE_FORMAT_VERSION, "words": words, "valences": valences}
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return dict(zip(words, valences))
+
+
+def load_vader_lexicon(cache_path=VADER_LEXICON_CACHE):
+    """
+    Load the VADER lexicon from the local pickle cache, building the cache
+    (and touching NLTK) only when it is missing or out of date.
+    """
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                payload = pickle.load(f)
+            if payload.get("version") == CACHE_FORMAT_VERSION:
+                return dict(zip(payload["words"], payload["valences"]))
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass
+    return build_lexicon_cache(cache_path)
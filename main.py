@@ -1,14 +1,130 @@
 # main.py
 import argparse
-from pipeline import NewsPipeline
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="News Analysis Pipeline")
+FIGURE_FORMATS = ("png", "svg")
+
+
+def parse_formats(value):
+    formats = [fmt.strip().lower() for fmt in value.split(",") if fmt.strip()]
+    invalid = [fmt for fmt in formats if fmt not in FIGURE_FORMATS]
+    if not formats or invalid:
+        raise argparse.ArgumentTypeError(
+            f"invalid format(s) {invalid or value!r}; choose from {', '.join(FIGURE_FORMATS)}")
+    return formats
+
+
+def parse_fields(value):
+    return [field.strip() for field in value.split(",") if field.strip()]
+
+
+def build_parser():
+    from sentiment_backends import available_backends
+
+    parser = argparse.ArgumentParser(
+        description="News Analysis Pipeline",
+        epilog="Without a command, all stages run in order (crawl, score, analyze, plot)."
+    )
     parser.add_argument("--update", action="store_true", help="Update headlines (append new data) from APIs.")
     parser.add_argument("--full-refresh", action="store_true", help="Fetch a completely new database from scratch.")
-    parser.add_argument("--mode", choices=["guardian", "all"], default="guardian",
-                        help="Choose scraper mode: 'guardian' (default) for Guardian-only or 'all' for all NewsAPI sources")
-    args = parser.parse_args()
-    
-    pipeline = NewsPipeline(mode=args.mode, force_update=args.update, full_refresh=args.full_refresh)
-    pipeline.run()
+    parser.add_argument("--mode", choices=["guardian", "newsapi", "all"], default="guardian",
+                        help="Choose scraper mode: 'guardian' (default) for Guardian-only, 'newsapi' for all NewsAPI "
+                             "sources, or 'all' to collect from both in parallel")
+    parser.add_argument("--db", default=None, help="Path of the SQLite database holding headlines and artifacts.")
+    parser.add_argument("--force", action="store_true",
+                        help="Recompute score/analyze/plot outputs even if their inputs are unchanged.")
+    parser.add_argument("--backend", choices=available_backends(), default="vader",
+                        help="Sentiment backend used by the score stage: 'vader' (default), 'lexicon' "
+                             "(compiled lexicon scorer) or 'tfidf' (linear TF-IDF model, see train-tfidf).")
+    parser.add_argument("--headless", action="store_true",
+                        help="Write figures to files instead of opening windows.")
+    parser.add_argument("--output-dir", default="figures", help="Directory for figures in headless mode.")
+    parser.add_argument("--formats", type=parse_formats, default=["png"],
+                        help="Comma-separated figure formats written in headless mode, e.g. 'png,svg' (default: png).")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    crawl = subparsers.add_parser("crawl", help="Fetch headlines from the APIs into the database.")
+    crawl.add_argument("--queue", action="store_true",
+                       help="Split the crawl into tasks in the shared crawl_tasks table and run queue workers.")
+    crawl.add_argument("--workers", type=int, default=None, help="Local worker processes for --queue (default 1).")
+    crawl.add_argument("--base-url", default=None, help="Override the Guardian API endpoint (e.g. a stub server).")
+    subparsers.add_parser("score", help="Score headlines that have no stored sentiment yet.")
+    analyze = subparsers.add_parser("analyze", help="Run the statistical tests on the scored headlines.")
+    analyze.add_argument("--window", type=int, choices=[30, 90, 365], default=None,
+                         help="Only use headlines from the last N days (rolling window).")
+    analyze.add_argument("--full", action="store_true",
+                         help="Recompute from every headline instead of updating the incremental state.")
+    analyze.add_argument("--by", choices=["source", "month"], default=None,
+                         help="Test every source or month separately, with exact/permutation p-values.")
+    analyze.add_argument("--csv", default=None, metavar="PATH",
+                         help="With --by, also write the per-subgroup results to this CSV file.")
+    subparsers.add_parser("plot", help="Draw the figures from the stored statistics.")
+    archive = subparsers.add_parser(
+        "archive", help="Summarise the raw-result archive, or export fields from it without crawling.")
+    archive.add_argument("--export", default=None, metavar="CSV",
+                         help="Write the archived results' fields to this CSV file.")
+    archive.add_argument("--fields", type=parse_fields, default=[],
+                         help="Comma-separated fields to export; dotted paths reach nested values, "
+                              "e.g. 'sectionName,webUrl' or 'source.name,url'.")
+    archive.add_argument("--source", default=None, help="Only export results of this source, e.g. 'guardian'.")
+    subparsers.add_parser("train-tfidf", help="Fit the 'tfidf' backend to the stored VADER scores.")
+    worker = subparsers.add_parser(
+        "worker", help="Process crawl tasks from the shared queue until it is drained.")
+    worker.add_argument("--worker-id", default=None, help="Worker name (default: <hostname>:<pid>).")
+    worker.add_argument("--base-url", default=None, help="Override the Guardian API endpoint (e.g. a stub server).")
+    worker.add_argument("--keep-polling", action="store_true",
+                        help="Keep waiting for new tasks instead of exiting when the queue is drained.")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "crawl" and not args.queue:
+        # The sequential crawl uses the scrapers' configured endpoints and runs in this process.
+        if args.base_url is not None or args.workers is not None:
+            parser.error("crawl: --base-url and --workers only apply with --queue")
+    if args.command == "analyze" and args.full and args.window is not None:
+        # The full recomputation always covers every headline.
+        parser.error("analyze: --full cannot be combined with --window")
+
+    # Imported after argument parsing so --help never pays for the pipeline imports.
+    from config import DB_NAME, GUARDIAN_CONFIG
+    base_url = getattr(args, "base_url", None) or GUARDIAN_CONFIG["base_url"]
+    if args.command == "worker":
+        from crawl_queue import run_worker
+        run_worker(args.db or DB_NAME, worker_id=args.worker_id, base_url=base_url,
+                   exit_when_drained=not args.keep_polling)
+        return
+
+    from pipeline import NewsPipeline
+    pipeline = NewsPipeline(
+        mode=args.mode,
+        force_update=args.update,
+        full_refresh=args.full_refresh,
+        db_name=args.db or DB_NAME,
+        headless=args.headless,
+        output_dir=args.output_dir,
+        formats=args.formats,
+        force=args.force,
+        backend=args.backend,
+    )
+    if args.command is None:
+        pipeline.run()
+        return
+    try:
+        if args.command == "crawl":
+            pipeline.crawl(queue=args.queue, workers=args.workers or 1, base_url=base_url)
+        elif args.command == "analyze":
+            pipeline.analyze(window=args.window, full=args.full, by=args.by, csv_path=args.csv)
+        elif args.command == "archive":
+            pipeline.archive(export=args.export, fields=args.fields, source=args.source)
+        elif args.command == "train-tfidf":
+            pipeline.train_tfidf()
+        else:
+            getattr(pipeline, args.command)()
+    finally:
+        pipeline.db.close()
+
+
+if __name__ == "__main__":
+    main()
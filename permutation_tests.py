@@ -0,0 +1,254 @@
+# permutation_tests.py
+import math
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import combinations
+
+import numpy as np
+
+from config import PERMUTATION_CONFIG
+from incremental_stats import GROUPS
+
+# Columns of the per-subgroup results, in output order.
+RESULT_COLUMNS = [
+    "group", "n", "positive", "negative", "neutral",
+    "chi2_stat", "chi2_p", "chi2_method", "chi2_permutations",
+    "anova_f", "anova_p", "anova_method", "anova_permutations",
+    "mwu_u", "mwu_p", "mwu_method", "mwu_permutations",
+]
+
+
+def build_subgroups(rows):
+    """
+    Turn (group, compound_score, sentiment) rows, ordered by group, into a
+    list of (group, scores, labels) with labels as indices into GROUPS.
+    Rows without a score or label are ignored.
+    """
+    codes = {group: code for code, group in enumerate(GROUPS)}
+    subgroups = []
+    current, scores, labels = None, [], []
+    for group, score, sentiment in rows:
+        if group != current:
+            if scores:
+                subgroups.append((current, np.array(scores), np.array(labels, dtype=np.int8)))
+            current, scores, labels = group, [], []
+        if score is None or sentiment not in codes:
+            continue
+        scores.append(score)
+        labels.append(codes[sentiment])
+    if scores:
+        subgroups.append((current, np.array(scores), np.array(labels, dtype=np.int8)))
+    return subgroups
+
+
+def _settled(hits, done, alpha, confidence):
+    """
+    True once the Clopper–Pearson interval for the p-value, after `done`
+    permutations with `hits` at least as extreme as observed, lies entirely
+    on one side of alpha.
+    """
+    from scipy.stats import beta
+
+    tail = (1 - confidence) / 2
+    lower = beta.ppf(tail, hits, done - hits + 1) if hits else 0.0
+    upper = beta.ppf(1 - tail, hits + 1, done - hits) if hits < done else 1.0
+    return upper < alpha or lower > alpha
+
+
+def _at_least(stats, observed):
+    # Tolerate floating-point noise when comparing with the observed statistic.
+    return stats >= observed - 1e-9 * max(1.0, abs(observed))
+
+
+def sequential_p_value(draw, observed, rng, batch_size, config):
+    """
+    Monte Carlo permutation p-value. draw(rng, size) returns the statistic
+    for `size` random relabellings; batches are drawn until the decision at
+    config["alpha"] is settled or config["max_permutations"] is reached.
+    Returns (p, permutations), with p = (hits + 1) / (permutations + 1).
+    """
+    hits = done = 0
+    while done < config["max_permutations"]:
+        size = min(batch_size, config["max_permutations"] - done)
+        hits += int(_at_least(draw(rng, size), observed).sum())
+        done += size
+        if _settled(hits, done, config["alpha"], config["confidence"]):
+            break
+    return (hits + 1) / (done + 1), done
+
+
+def _batch_size(n, config):
+    # Keep each batch's permutation matrix within max_batch_cells elements.
+    return max(1, min(config["batch_size"], config["max_batch_cells"] // max(n, 1)))
+
+
+def _chi2_contingency(counts, totals):
+    """
+    Chi-square statistic of the 2 x 3 table [counts, totals - counts] for
+    every row of counts (an array of shape (..., 3)). Sentiments absent from
+    the whole corpus are left out.
+    """
+    present = totals > 0
+    counts = counts[..., present]
+    totals = totals[present]
+    n = counts.sum(axis=-1, keepdims=True)
+    grand = totals.sum()
+    if grand == 0 or n.max() == 0 or (grand - n).max() == 0:
+        return np.zeros(counts.shape[:-1])
+    table = np.stack([counts, totals - counts], axis=-2)
+    expected = np.stack([n * totals / grand, (grand - n) * totals / grand], axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(expected > 0, (table - expected) ** 2 / expected, 0.0)
+    return terms.sum(axis=(-2, -1))
+
+
+def chi_square_test(counts, totals, rng, config):
+    """
+    Does this subgroup's mix of sentiments differ from the rest of the
+    corpus? Chi-square test of the subgroup-vs-rest contingency table.
+    Relabelling which headlines belong to the subgroup makes its counts
+    multivariate hypergeometric, so the p-value is exact (enumerating every
+    possible count vector) when there are at most config["exact_limit"] of
+    them, and otherwise estimated from draws of that distribution.
+    Returns (statistic, p, method, permutations).
+    """
+    from scipy.special import gammaln
+
+    counts = np.asarray(counts, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    n = int(counts.sum())
+    observed = float(_chi2_contingency(counts, totals))
+    if (n + 1) * (n + 2) // 2 <= config["exact_limit"]:
+        a, b = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing="ij")
+        c = n - a - b
+        valid = (c >= 0) & (a <= totals[0]) & (b <= totals[1]) & (c <= totals[2])
+        outcomes = np.stack([a[valid], b[valid], c[valid]], axis=-1)
+
+        def log_comb(k, j):
+            return gammaln(k + 1) - gammaln(j + 1) - gammaln(k - j + 1)
+
+        log_pmf = log_comb(totals, outcomes).sum(axis=-1) - log_comb(totals.sum(), n)
+        stats = _chi2_contingency(outcomes, totals)
+        p = float(np.exp(log_pmf)[_at_least(stats, observed)].sum())
+        return observed, min(p, 1.0), "exact", 0
+
+    def draw(rng, size):
+        return _chi2_contingency(rng.multivariate_hypergeometric(totals, n, size=size), totals)
+
+    p, done = sequential_p_value(draw, observed, rng, config["batch_size"], config)
+    return observed, p, "permutation", done
+
+
+def anova_test(scores, labels, rng, config):
+    """
+    One-way ANOVA of the scores across the sentiment groups present in the
+    subgroup, with a permutation p-value from shuffling the labels. The total
+    sum of squares does not change under relabelling, so the permutations
+    compare sum(S_g^2 / n_g) (S_g: group score sums), which orders them the
+    same way as F. Returns (F, p, method, permutations).
+    """
+    order = np.argsort(labels, kind="stable")
+    x = scores[order]
+    sizes = np.bincount(labels, minlength=len(GROUPS))
+    sizes = sizes[sizes > 0]
+    n, k = len(x), len(sizes)
+    if k < 2 or n <= k:
+        return np.nan, np.nan, "", 0
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    def between(matrix):
+        sums = np.add.reduceat(matrix, starts, axis=-1)
+        return (sums ** 2 / sizes).sum(axis=-1)
+
+    observed = float(between(x))
+    ss_between = observed - x.sum() ** 2 / n
+    ss_within = float(((x - x.mean()) ** 2).sum()) - ss_between
+    if ss_within <= 1e-12:
+        # Every group is constant: the labels are a function of the scores.
+        f_stat = np.inf if ss_between > 0 else np.nan
+    else:
+        f_stat = (ss_between / (k - 1)) / (ss_within / (n - k))
+
+    def draw(rng, size):
+        return between(rng.permuted(np.broadcast_to(x, (size, n)), axis=1))
+
+    p, done = sequential_p_value(draw, observed, rng, _batch_size(n, config), config)
+    return float(f_stat), p, "permutation", done
+
+
+def mann_whitney_test(scores, labels, rng, config, first="positive", second="negative"):
+    """
+    Two-sided Mann–Whitney U test between two sentiment groups of the
+    subgroup. The statistic is |R1 - n1 (n + 1) / 2| on the pooled midranks
+    (R1: rank sum of the first group), which is |U1 - n1 n2 / 2|. The p-value
+    is exact (every split of the pooled ranks) when there are at most
+    config["exact_limit"] splits, and a permutation estimate otherwise.
+    Returns (U1, p, method, permutations).
+    """
+    from scipy.stats import rankdata
+
+    x = scores[labels == GROUPS.index(first)]
+    y = scores[labels == GROUPS.index(second)]
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return np.nan, np.nan, "", 0
+    n = n1 + n2
+    ranks = rankdata(np.concatenate([x, y]))
+    centre = n1 * (n + 1) / 2
+    rank_sum = float(ranks[:n1].sum())
+    observed = abs(rank_sum - centre)
+    u1 = rank_sum - n1 * (n1 + 1) / 2
+
+    if math.comb(n, n1) <= config["exact_limit"]:
+        splits = np.fromiter((i for split in combinations(range(n), n1) for i in split),
+                             dtype=np.int64).reshape(-1, n1)
+        stats = np.abs(ranks[splits].sum(axis=1) - centre)
+        return u1, float(_at_least(stats, observed).mean()), "exact", 0
+
+    def draw(rng, size):
+        shuffled = rng.permuted(np.broadcast_to(ranks, (size, n)), axis=1)
+        return np.abs(shuffled[:, :n1].sum(axis=1) - centre)
+
+    p, done = sequential_p_value(draw, observed, rng, _batch_size(n, config), config)
+    return u1, p, "permutation", done
+
+
+def subgroup_rng(name, seed, test):
+    """Random generator for one test of one subgroup, independent of the order subgroups run in."""
+    key = zlib.crc32(str(name).encode("utf-8"))
+    return np.random.default_rng(np.random.SeedSequence([seed, key, test]))
+
+
+def test_subgroup(subgroup, totals, config):
+    """Run the three tests on one (group, scores, labels) subgroup; returns a RESULT_COLUMNS row."""
+    name, scores, labels = subgroup
+    counts = np.bincount(labels, minlength=len(GROUPS))
+    seed = config["seed"]
+    chi2 = chi_square_test(counts, totals, subgroup_rng(name, seed, 0), config)
+    anova = anova_test(scores, labels, subgroup_rng(name, seed, 1), config)
+    mwu = mann_whitney_test(scores, labels, subgroup_rng(name, seed, 2), config)
+    row = [name, int(counts.sum())] + [int(count) for count in counts]
+    for stat, p, method, permutations in (chi2, anova, mwu):
+        row += [float(stat), float(p), method, int(permutations)]
+    return row
+
+
+def run_permutation_tests(subgroups, config=PERMUTATION_CONFIG, workers=None):
+    """
+    Test every subgroup, spreading them over a pool of worker processes
+    (workers=None: one per CPU; 1: run in this process). The chi-square
+    test compares each subgroup with the corpus formed by all subgroups.
+    Returns the RESULT_COLUMNS rows in subgroup order.
+    """
+    totals = np.zeros(len(GROUPS), dtype=np.int64)
+    for _, _, labels in subgroups:
+        totals += np.bincount(labels, minlength=len(GROUPS))
+    task = partial(test_subgroup, totals=totals, config=config)
+    if workers == 1 or len(subgroups) < 2:
+        return [task(subgroup) for subgroup in subgroups]
+    # Several chunks per worker keep the pool busy when subgroup sizes vary widely.
+    chunksize = max(1, len(subgroups) // ((workers or os.cpu_count() or 1) * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(task, subgroups, chunksize=chunksize))
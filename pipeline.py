@@ -1,22 +1,30 @@
 # pipeline.py
 
-import datetime
 import os
-import json
-import pandas as pd
+import re
+import zlib
 from config import (
-    INCLUSION_KEYWORDS, NEWSAPI_API_KEY, GUARDIAN_API_KEYS, DB_NAME,
-    NEWSAPI_CONFIG, GUARDIAN_CONFIG, get_date_range
+    ARCHIVE_CONFIG, INCLUSION_KEYWORDS, DB_NAME, GUARDIAN_CONFIG, PERMUTATION_CONFIG, PLOT_CONFIG,
+    get_date_range
 )
 from database import DatabaseManager
-from analysis import SentimentAnalyzer
-from plotting import plot_sentiment_distribution, plot_supplementary_table
-from scrapers.guardian_scraper import GuardianScraper
-from scrapers.newsapi_scraper import NewsAPIScraper
+from artifacts import (
+    STAGE_VERSIONS, content_hash, is_up_to_date, payload_to_stats, stats_to_payload
+)
+
+# Heavy modules (pandas, requests, nltk, scipy, matplotlib) are imported inside
+# the stage that needs them so that --help and crawl-only runs start quickly.
 
 # Files for tracking state
 SEARCHED_KEYWORDS_FILE = "searched_keywords.txt"
 
+# Scraper sources used by each --mode.
+MODE_SOURCES = {
+    "guardian": ("guardian",),
+    "newsapi": ("newsapi",),
+    "all": ("guardian", "newsapi"),
+}
+
 def get_searched_keywords(file_path=SEARCHED_KEYWORDS_FILE):
     """
     Read the keywords that have been completely processed already from the file.
@@ -39,124 +47,448 @@ def update_searched_keywords(new_keywords, file_path=SEARCHED_KEYWORDS_FILE):
         for kw in sorted(updated):
             f.write(kw + "\n")
 
-def update_finished_keywords():
+def get_finished_keywords(source):
     """
-    Examine the resume state (stored in resume_state.json) and add any keyword
-    that is finished (i.e. its resume page is 1) to the searched_keywords file.
+    Keywords a source has finished, i.e. marked KEYWORD_DONE in that
+    source's resume state (resume_state.json for the Guardian,
+    resume_state_<source>.json otherwise).
     """
     # Assume resume_state functions are in resume_state.py in the project root.
-    from resume_state import load_resume_state
-    rs = load_resume_state()
-    finished_keywords = {kw for kw, page in rs.items() if page == 1}
+    from resume_state import KEYWORD_DONE, load_resume_state, resume_state_file
+    rs = load_resume_state(resume_state_file(source))
+    return {kw for kw, page in rs.items() if page == KEYWORD_DONE}
+
+def update_finished_keywords(sources=("guardian",)):
+    """
+    Add any keyword that every given source has finished to the
+    searched_keywords file.
+    """
+    finished_keywords = set.intersection(*(get_finished_keywords(source) for source in sources))
     update_searched_keywords(finished_keywords)
 
 class NewsPipeline:
     """
     Orchestrates data retrieval, analysis, and plotting.
-    Supports two modes:
+    Supports three modes:
       - "guardian" uses the official Guardian API (default).
-      - "all" uses NewsAPI across all sources.
+      - "newsapi" uses NewsAPI across all sources.
+      - "all" runs both collectors in parallel into one deduplicated corpus.
     Update strategies:
       - Incremental update (default): fetch new data from where it left off.
       - Full refresh: clear the current database, resume state, and searched keywords, then fetch all data from scratch.
+    The work is split into four stages (crawl, score, analyze, plot) that
+    communicate only through the database, so each can run in a separate
+    process or on a separate machine. The score, analyze and plot stages
+    record a content hash of their inputs and skip work when it is unchanged.
     """
-    def __init__(self, mode="guardian", force_update=False, full_refresh=False):
+    def __init__(self, mode="guardian", force_update=False, full_refresh=False,
+                 db_name=DB_NAME, headless=False, output_dir="figures",
+                 formats=("png",), force=False, backend="vader"):
         self.mode = mode
         self.force_update = force_update
         self.full_refresh = full_refresh
-        self.db = DatabaseManager(DB_NAME)
+        self.headless = headless
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.force = force
+        self.backend = backend
+        self.db = DatabaseManager(db_name)
         self.db.initialize_database()
         self.start_date, self.to_date = get_date_range()
 
+    def reset_collection_state(self):
+        """
+        Full refresh: clear the headlines and every derived artifact, the
+        resume state of this mode's sources and the searched keywords.
+        """
+        print("Full refresh selected: clearing database and resetting resume state and searched keywords.")
+        self.db.clear_headlines()
+        self.db.clear_artifacts()
+        from resume_state import resume_state_file, save_resume_state
+        for source in MODE_SOURCES[self.mode]:
+            save_resume_state({}, resume_state_file(source))  # Clear resume_state*.json
+        with open(SEARCHED_KEYWORDS_FILE, "w") as f:
+            f.write("")  # Clear searched_keywords file
+
     def retrieve_data(self):
-        # If full refresh is selected, clear the database and reset searched keywords.
+        """
+        Fetch headlines for the keywords not yet finished and add any that are
+        not already stored. Returns the number of new headlines stored.
+        """
         if self.full_refresh:
-            print("Full refresh selected: clearing database and resetting resume state and searched keywords.")
-            self.db.clear_headlines()
-            from resume_state import save_resume_state
-            save_resume_state({})  # Clear resume_state.json
-            with open(SEARCHED_KEYWORDS_FILE, "w") as f:
-                f.write("")  # Clear searched_keywords file
-            existing_df = None
-        else:
-            if self.db.has_headlines():
-                print("Loading headlines from database...")
-                existing_df = self.db.load_headlines()
-            else:
-                existing_df = None
+            self.reset_collection_state()
 
         # Determine which keywords haven't been completely processed.
         searched = get_searched_keywords()
         remaining_keywords = list(set(INCLUSION_KEYWORDS) - searched)
         if not remaining_keywords:
             print("All keywords have been processed already. No new data to fetch.")
-            return self.db.load_headlines()
+            return 0
         print("Remaining keywords to search:", remaining_keywords)
 
-        # Instantiate the appropriate scraper based on the mode.
-        if self.mode == "guardian":
-            print("Using Guardian-only scraper (API only)...")
-            scraper = GuardianScraper(
-                GUARDIAN_API_KEYS,  # a list of API keys from config.py
-                self.start_date,
-                self.to_date,
-                remaining_keywords,
-                page_size=NEWSAPI_CONFIG["page_size"],
-                max_pages=None  # We rely on resume state for resuming.
-            )
-        elif self.mode == "all":
-            print("Using general NewsAPI scraper (all sources) with debugging...")
-            scraper = NewsAPIScraper(
-                NEWSAPI_API_KEY,
-                self.start_date,
-                self.to_date,
-                remaining_keywords,
-                page_size=NEWSAPI_CONFIG["page_size"],
-                max_pages=None
-            )
-        else:
+        if self.mode not in MODE_SOURCES:
             raise ValueError("Invalid scraper mode specified.")
+        from collector import MultiSourceCollector
+        from scrapers import get_scraper_class
 
-        # Collect new headlines for the remaining keywords.
-        new_headlines = scraper.collect_headlines()
-        print(f"New headlines collected: {len(new_headlines)}")
+        # One scraper per source, each running in its own rate-limited thread.
+        sources = MODE_SOURCES[self.mode]
+        print(f"Collecting from: {', '.join(sources)}")
+        scrapers = []
+        for source in sources:
+            # Each source skips the keywords it has already finished on its own.
+            keywords = sorted(set(remaining_keywords) - get_finished_keywords(source))
+            if keywords:
+                scrapers.append(get_scraper_class(source).from_config(self.start_date, self.to_date, keywords))
+        raw_archive = self.open_archive() if ARCHIVE_CONFIG["enabled"] else None
+        try:
+            reports = MultiSourceCollector(scrapers, self.db, archive=raw_archive).run()
+        finally:
+            if raw_archive is not None:
+                raw_archive.close()
 
         # After scraping, update searched keywords only for keywords that are finished.
-        update_finished_keywords()
+        update_finished_keywords(sources)
+        return sum(report.new_headlines for report in reports.values())
 
-        # Merge new headlines with any existing database data.
-        if existing_df is not None:
-            new_df = pd.DataFrame(new_headlines)
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-            deduped_df = combined_df.drop_duplicates(subset=["source", "headline", "date"])
+    def open_archive(self):
+        """The raw-result archive that belongs to this pipeline's database."""
+        from archive import RawArticleArchive, archive_directory
+        return RawArticleArchive(archive_directory(self.db.db_name))
+
+    def archive(self, export=None, fields=(), source=None):
+        """
+        Print what the raw archive holds or, with export, write the given
+        (dotted) fields of every archived result to a CSV file. This is a
+        local scan of the archive, so no API requests are made.
+        """
+        raw_archive = self.open_archive()
+        try:
+            if export is None:
+                stats = raw_archive.stats()
+                print(f"Raw archive '{raw_archive.directory}': {sum(stats['articles'].values())} articles "
+                      f"in {stats['blocks']} blocks, {stats['stored_bytes'] / 1e6:.1f} MB stored "
+                      f"({stats['raw_bytes'] / 1e6:.1f} MB uncompressed).")
+                for name, count in stats["articles"].items():
+                    print(f"  {name:10s} {count:9d}")
+                return
+            import csv
+            written = 0
+            with open(export, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["article_id", "source"] + list(fields))
+                for row in raw_archive.export_fields(fields, source):
+                    writer.writerow(row)
+                    written += 1
+            print(f"Exported {written} archived results to '{export}'.")
+        finally:
+            raw_archive.close()
+
+    def crawl(self, queue=False, workers=1, base_url=GUARDIAN_CONFIG["base_url"]):
+        """
+        Fetch new headlines. With queue=True the remaining keywords are split
+        into tasks in the shared crawl_tasks table and processed by `workers`
+        local worker processes; more workers can join from other hosts with
+        `python main.py --db <shared db> worker`.
+        """
+        if queue:
+            self.crawl_with_queue(workers, base_url)
         else:
-            deduped_df = pd.DataFrame(new_headlines)
+            inserted = self.retrieve_data()
+            print(f"Stored {inserted} new headlines.")
+        print(f"Database now contains {self.db.count_headlines()} headlines.")
 
-        self.db.clear_headlines()
-        self.db.store_headlines(deduped_df.to_dict("records"))
-        return deduped_df
+    def crawl_with_queue(self, workers, base_url):
+        import multiprocessing
+        from crawl_queue import CrawlQueue, run_worker
 
-    def run(self):
-        headlines = self.retrieve_data()
-        print(f"Database now contains {len(headlines)} headlines.")
+        if self.mode != "guardian":
+            raise ValueError("The crawl work queue only supports the Guardian mode.")
+        crawl_queue = CrawlQueue(self.db.db_name)
+        try:
+            if self.full_refresh:
+                self.reset_collection_state()
+                # Finished tasks would otherwise keep the whole crawl from being queued again.
+                crawl_queue.clear()
+            # Tasks that failed in an earlier crawl (API outage, exhausted quota) get another go.
+            retried = crawl_queue.retry_failed()
+            remaining_keywords = sorted(set(INCLUSION_KEYWORDS) - get_searched_keywords())
+            added = crawl_queue.seed(remaining_keywords, self.start_date, self.to_date)
+            print(f"Queued {added} new crawl tasks and {retried} failed tasks for retry; "
+                  f"starting {workers} worker(s)...")
+            processes = [
+                multiprocessing.Process(target=run_worker, args=(self.db.db_name,),
+                                        kwargs={"base_url": base_url})
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            print("Crawl task status:", crawl_queue.status_counts())
+            # Keywords whose every task is done need no further crawling, queued or not.
+            update_searched_keywords(crawl_queue.finished_keywords() & set(remaining_keywords))
+        finally:
+            crawl_queue.close()
+
+    def score(self):
+        """
+        Score every headline that has no stored sentiment yet with the selected
+        backend. Skipped entirely when the headlines and backend are unchanged
+        since the last run.
+        """
+        from analysis import SentimentAnalyzer
+        analyzer = SentimentAnalyzer(self.backend)
+        scorer_id = analyzer.backend.scorer_id
+
+        input_hash = content_hash(self.db.headlines_hash(), scorer_id)
+        artifact = self.db.get_artifact("scores")
+        if not self.force and is_up_to_date(artifact, "scores", input_hash):
+            print("Scores are up to date; skipping sentiment analysis.")
+            return
 
-        analyzer = SentimentAnalyzer()
-        headlines = analyzer.perform_sentiment_analysis(headlines)
+        # A different scorer (or output format) invalidates every stored score.
+        # The generation counts these rescorings so incremental statistics
+        # built from older scores know to start over.
+        generation = artifact["payload"].get("generation", 0) if artifact else 0
+        if (self.force or artifact is None or artifact["version"] != STAGE_VERSIONS["scores"]
+                or artifact["payload"].get("scorer") != scorer_id):
+            self.db.clear_scores()
+            generation += 1
 
-        # ←—— INSERTED: print sentiment % breakdown
-        sentiment_counts = headlines['sentiment'].value_counts(dropna=False)
+        headlines = self.db.load_unscored_headlines()
+        print(f"Scoring {len(headlines)} headlines with the '{self.backend}' backend...")
+        if len(headlines):
+            headlines = analyzer.perform_sentiment_analysis(headlines)
+            self.db.store_scores(
+                (int(row.id), None if row.compound_score != row.compound_score else row.compound_score,
+                 row.sentiment)
+                for row in headlines.itertuples(index=False)
+            )
+        self.db.save_artifact("scores", STAGE_VERSIONS["scores"], input_hash,
+                              {"scorer": scorer_id, "scored": len(headlines), "generation": generation})
+
+    def train_tfidf(self):
+        """
+        Fit the TF-IDF linear backend to the stored VADER scores.
+        """
+        from config import SENTIMENT_MODEL_PATH
+        from sentiment_backends import train_tfidf_model
+
+        artifact = self.db.get_artifact("scores")
+        if artifact is None or not artifact["payload"].get("scorer", "").startswith("vader"):
+            raise RuntimeError("Training needs VADER scores; run 'python main.py --backend vader score' first.")
+        headlines = self.db.load_scored_headlines().dropna(subset=["headline", "compound_score"])
+        print(f"Training the TF-IDF model on {len(headlines)} VADER-scored headlines...")
+        rmse = train_tfidf_model(headlines["headline"].tolist(), headlines["compound_score"].values)
+        print(f"Saved {SENTIMENT_MODEL_PATH} (training RMSE {rmse:.4f}).")
+
+    def analyze(self, window=None, full=False, by=None, csv_path=None):
+        """
+        Run the statistical tests on the scored corpus and store the results.
+        By default the tests are refreshed from the persisted incremental
+        state, which only reads headlines scored since the last run; window
+        restricts them to the last 30/90/365 days. full=True recomputes them
+        from every headline instead. Returns the statistics dictionary.
+        With by="source" or by="month" the tests are instead run per subgroup
+        with permutation p-values (see analyze_subgroups).
+        """
+        if by is not None:
+            return self.analyze_subgroups(by, csv_path)
+        if full:
+            stats_results = self.analyze_full()
+        else:
+            stats_results = self.analyze_incremental(window)
+        self.print_summary(stats_results)
+        return stats_results
+
+    def analyze_full(self):
+        input_hash = self.db.scores_hash()
+        artifact = self.db.get_artifact("stats")
+        if not self.force and is_up_to_date(artifact, "stats", input_hash):
+            print("Statistics are up to date; skipping statistical tests.")
+            return payload_to_stats(artifact["payload"])
+        from analysis import SentimentAnalyzer
+        headlines = self.db.load_scored_headlines()
+        stats_results = SentimentAnalyzer().perform_statistical_tests(headlines)
+        self.db.save_artifact("stats", STAGE_VERSIONS["stats"], input_hash,
+                              stats_to_payload(stats_results))
+        return stats_results
+
+    def analyze_incremental(self, window=None):
+        from analysis import SentimentAnalyzer
+        from incremental_stats import StatsState
+
+        state_name = "all" if window is None else f"{window}d"
+        artifact_name = "stats" if window is None else f"stats_{window}d"
+        scores = self.db.get_artifact("scores")
+        generation = scores["payload"].get("generation") if scores else None
+
+        # Start over if the scores were rebuilt or rows the state has seen are gone.
+        payload = self.db.load_stats_state(state_name)
+        state = StatsState.from_payload(payload) if payload is not None else None
+        if (self.force or state is None or state.generation != generation
+                or self.db.count_scores_up_to(state.last_headline_id) != state.rows_seen):
+            state = StatsState(window)
+            state.generation = generation
+        added = state.update(self.db.load_scored_rows_after(state.last_headline_id))
+        print(f"Updated {state_name} statistics with {added} newly scored headlines.")
+
+        input_hash = content_hash(state_name, generation, state.last_headline_id, state.rows_seen)
+        artifact = self.db.get_artifact(artifact_name)
+        if not self.force and is_up_to_date(artifact, "stats", input_hash):
+            print("Statistics are up to date; skipping statistical tests.")
+            stats_results = payload_to_stats(artifact["payload"])
+        else:
+            stats_results = SentimentAnalyzer().build_results(**state.test_statistics())
+            self.db.save_artifact(artifact_name, STAGE_VERSIONS["stats"], input_hash,
+                                  stats_to_payload(stats_results))
+        self.db.save_stats_state(state_name, state.to_payload())
+        return stats_results
+
+    def analyze_subgroups(self, by, csv_path=None):
+        """
+        Chi-square (subgroup vs rest of the corpus), ANOVA and Mann–Whitney U
+        tests for every source or month, with exact or permutation p-values
+        computed across a pool of worker processes. Results are stored as the
+        "permutation_<by>" artifact and, with csv_path, written to a CSV file.
+        Returns the result rows (permutation_tests.RESULT_COLUMNS).
+        """
+        from permutation_tests import RESULT_COLUMNS, build_subgroups, run_permutation_tests
+
+        loaders = {"source": self.db.scored_rows_by_source, "month": self.db.scored_rows_by_month}
+        if by not in loaders:
+            raise ValueError(f"Cannot group the tests by {by!r}; choose 'source' or 'month'.")
+        artifact_name = f"permutation_{by}"
+        input_hash = content_hash(self.db.scores_hash(), by, PERMUTATION_CONFIG)
+        artifact = self.db.get_artifact(artifact_name)
+        if not self.force and is_up_to_date(artifact, "permutation", input_hash):
+            print(f"Permutation tests by {by} are up to date; skipping them.")
+            rows = artifact["payload"]["rows"]
+        else:
+            import time
+            subgroups = build_subgroups(loaders[by]())
+            print(f"Running permutation tests for {len(subgroups)} subgroups by {by}...")
+            start = time.perf_counter()
+            rows = run_permutation_tests(subgroups, PERMUTATION_CONFIG, workers=PERMUTATION_CONFIG["workers"])
+            print(f"Finished in {time.perf_counter() - start:.1f}s.")
+            self.db.save_artifact(artifact_name, STAGE_VERSIONS["permutation"], input_hash,
+                                  {"columns": RESULT_COLUMNS, "rows": rows})
+        self.print_subgroup_summary(by, rows, RESULT_COLUMNS)
+        if csv_path:
+            import csv
+            with open(csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(RESULT_COLUMNS)
+                writer.writerows(rows)
+            print(f"Wrote per-{by} results to '{csv_path}'.")
+        return rows
+
+    def print_subgroup_summary(self, by, rows, columns, limit=10):
+        alpha = PERMUTATION_CONFIG["alpha"]
+        column = {name: i for i, name in enumerate(columns)}
+        print(f"\nPermutation tests by {by} ({len(rows)} subgroups, alpha={alpha}):")
+        for test, label in (("chi2", "Chi-square vs rest"), ("anova", "ANOVA"), ("mwu", "Mann–Whitney U")):
+            p_values = [row[column[f"{test}_p"]] for row in rows]
+            tested = [p for p in p_values if p == p]  # Skip NaN (test not applicable).
+            exact = sum(1 for row in rows if row[column[f"{test}_method"]] == "exact")
+            permutations = sum(row[column[f"{test}_permutations"]] for row in rows)
+            print(f"  {label:20s} significant in {sum(p <= alpha for p in tested):5d} of {len(tested):5d} "
+                  f"({exact} exact, {permutations} permutations drawn)")
+        # Rank by effect size rather than p-value, which mostly reflects subgroup size.
+        # Each chi-square table is subgroup vs rest (2 rows) over the whole corpus,
+        # so Cramér's V is sqrt(chi2 / corpus size).
+        corpus_size = sum(row[column["n"]] for row in rows)
+
+        def cramers_v(row):
+            return (row[column["chi2_stat"]] / corpus_size) ** 0.5 if corpus_size else 0.0
+
+        ranked = sorted(rows, key=lambda row: (-cramers_v(row), row[column["chi2_p"]]))[:limit]
+        if ranked:
+            print("  Subgroups whose sentiment mix differs most from the rest (by Cramér's V):")
+            for row in ranked:
+                print(f"    {str(row[column['group']])[:30]:30s} n={row[column['n']]:6d} "
+                      f"V={cramers_v(row):.4f} chi2={row[column['chi2_stat']]:8.2f} "
+                      f"p={row[column['chi2_p']]:.4g} ({row[column['chi2_method']]})")
+
+    def plot(self):
+        """
+        Draw the figures from the stored statistics and the per-source and
+        per-month aggregates. Interactive mode shows the supplementary table
+        and the sentiment distribution chart. Headless mode exports every chart
+        to output_dir in a pool of worker processes and skips charts whose
+        aggregates have not changed since they were last written.
+        """
+        artifact = self.db.get_artifact("stats")
+        if artifact is None:
+            raise RuntimeError("No statistics found; run the 'analyze' stage first.")
+
+        if self.headless:
+            from plotting import render_charts
+            charts = self.build_charts(artifact["payload"], breakdowns=True)
+            rendered, skipped = render_charts(charts, self.output_dir, self.formats,
+                                              workers=PLOT_CONFIG["workers"], force=self.force)
+            print(f"Rendered {len(rendered)} charts to '{self.output_dir}' "
+                  f"({len(skipped)} unchanged charts skipped).")
+        else:
+            import matplotlib.pyplot as plt
+            from plotting import render_figure
+            for chart in self.build_charts(artifact["payload"], breakdowns=False):
+                render_figure(chart)
+            plt.show()
+
+    def build_charts(self, stats_payload, breakdowns=True):
+        """
+        Chart specs ({"name", "kind", "data"}) for plotting.render_charts,
+        built from precomputed aggregates only.
+        """
+        charts = [
+            {"name": "supplementary_table", "kind": "supplementary_table",
+             "data": stats_payload["supplementary_table"]},
+            {"name": "sentiment_distribution", "kind": "sentiment_distribution",
+             "data": {"counts": stats_payload["sentiment_counts"],
+                      "mannwhitney_p": stats_payload["mannwhitney_p"]}},
+        ]
+        if not breakdowns:
+            return charts
+
+        by_source = self.db.sentiment_counts_by_source()
+        top_sources = sorted(by_source, key=lambda source: -sum(by_source[source].values()))
+        top_sources = top_sources[:PLOT_CONFIG["top_sources"]]
+        by_month = self.db.sentiment_counts_by_month()
+        months = sorted(by_month)
+
+        for name, groups, counts, xlabel in (("sentiment_by_source", top_sources, by_source, "Source"),
+                                             ("sentiment_by_month", months, by_month, "Month")):
+            charts.append({"name": name, "kind": "sentiment_by_group", "data": {
+                "groups": groups,
+                "counts": {sentiment: [counts[g].get(sentiment, 0) for g in groups]
+                           for sentiment in ("positive", "neutral", "negative")},
+                "title": f"Headline Sentiment by {xlabel}",
+                "xlabel": xlabel,
+            }})
+        for prefix, groups, counts in (("source", top_sources, by_source), ("month", months, by_month)):
+            for group in groups:
+                # Different names can share a slug ("BBC News", "bbc-news"), so a hash of
+                # the exact name keeps every chart's file name unique and stable.
+                slug = re.sub(r"[^A-Za-z0-9]+", "_", group).strip("_").lower()
+                digest = f"{zlib.crc32(group.encode('utf-8')):08x}"
+                name = f"{prefix}_{slug}_{digest}" if slug else f"{prefix}_{digest}"
+                charts.append({"name": name, "kind": "sentiment_distribution", "data": {
+                    "counts": counts[group],
+                    "title": f"Sentiment Distribution: {group}",
+                }})
+        return charts
+
+    def print_summary(self, stats_results):
+        # Print the sentiment % breakdown.
+        sentiment_counts = stats_results["sentiment_counts"]
         total = sentiment_counts.sum()
         print("\nSentiment percentages:")
         for sentiment, count in sentiment_counts.items():
             pct = count / total * 100
             print(f"  {sentiment.capitalize():8s}: {pct:5.2f}%")
 
-        stats_results = analyzer.perform_statistical_tests(headlines)
-
-        # show supplementary stats table as figure
-        supp_fig = plot_supplementary_table(stats_results["supplementary_table"])
-        supp_fig.show()
-
         # interpret chi² and Mann–Whitney
         if stats_results["chi2_p"] < 0.05:
             chi_interpretation = (
@@ -184,20 +516,16 @@ class NewsPipeline:
         print("\nStatistical Analysis Summary:")
         print(f"Based on our tests, {chi_interpretation} {mwu_interpretation}")
 
-        plot_sentiment_distribution(headlines, stats_results)
-        self.db.close()
+    def run(self):
+        try:
+            self.crawl()
+            self.score()
+            self.analyze()
+            self.plot()
+        finally:
+            self.db.close()
 
 
 if __name__ == "__main__":
-    import argparse
-    parser = argparse.ArgumentParser(description="News Analysis Pipeline")
-    parser.add_argument("--update", action="store_true",
-                        help="Update headlines (append new data) from APIs.")
-    parser.add_argument("--full-refresh", action="store_true",
-                        help="Fetch a completely new database from scratch.")
-    parser.add_argument("--mode", choices=["guardian", "all"], default="guardian",
-                        help="Choose scraper mode: 'guardian' (default) for Guardian-only or 'all' for all NewsAPI sources")
-    args = parser.parse_args()
-
-    pipeline = NewsPipeline(mode=args.mode, force_update=args.update, full_refresh=args.full_refresh)
-    pipeline.run()
+    from main import main
+    main()
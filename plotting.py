@@ -1,8 +1,34 @@
 # plotting.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 
-import matplotlib.pyplot as plt
+
+def use_headless_backend():
+    """
+    Switch matplotlib to the non-interactive Agg backend so figures can be
+    written to files on machines without a display.
+    """
+    matplotlib.use("Agg")
+
+
+def save_figure(fig, output_dir, name, formats=("png",)):
+    """
+    Write a figure to output_dir as <name>.<fmt> for every requested format
+    (e.g. "png", "svg") and close it. Returns the list of written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt, bbox_inches="tight")
+        paths.append(path)
+    plt.close(fig)
+    return paths
 
 def plot_supplementary_table(supp_table):
     """
@@ -56,65 +82,183 @@ def plot_supplementary_table(supp_table):
     return fig
 
 
-def plot_sentiment_distribution(df, stats_results=None):
+DISTRIBUTION_TITLE = "Sentiment Distribution of Newspaper Headlines"
+
+
+def plot_sentiment_distribution(sentiment_counts, stats_results=None, title=DISTRIBUTION_TITLE):
     """
     Generate a polished bar chart of headline sentiment distribution with error bars.
     The x-axis is labelled "Sentiment" and the three bars are labelled "Positive", "Neutral", "Negative".
     If stats_results is provided, annotate significance between the Positive and Negative bars.
+
+    Parameters:
+      - sentiment_counts: mapping of lowercase sentiment label -> number of headlines
+        (e.g. the "sentiment_counts" entry of the statistics results).
+      - stats_results: optional mapping holding "mannwhitney_p".
     """
     # Set the category order we want to display.
     # Note: The sentiment analysis produces lowercase values, so we use lower() when retrieving counts.
     categories = ['Positive', 'Neutral', 'Negative']
+
+    counts = [int(sentiment_counts.get(cat.lower(), 0)) for cat in categories]
+    errors = [np.sqrt(n) for n in counts]
     
-    counts = []
-    errors = []
-    for cat in categories:
-        # Retrieve counts by matching lowercase versions.
-        n = int(df['sentiment'].value_counts().get(cat.lower(), 0))
-        counts.append(n)
-        errors.append(np.sqrt(n))
-    
-    fig, ax = plt.subplots(figsize=(8, 6))
-    plt.style.use('ggplot')
-    positions = np.arange(len(categories))
+    # A style context rather than plt.style.use, which would change every later
+    # figure drawn in this process (including other charts in a render worker).
+    with plt.style.context('ggplot'):
+        fig, ax = plt.subplots(figsize=(8, 6))
+        positions = np.arange(len(categories))
     
-    bars = ax.bar(positions, counts, width=0.6, yerr=errors, capsize=5)
+        bars = ax.bar(positions, counts, width=0.6, yerr=errors, capsize=5)
     
-    # Set the x-axis label and tick labels.
-    ax.set_xlabel("Sentiment", fontsize=12, labelpad=20)
-    ax.set_xticks(positions)
-    ax.set_xticklabels(categories, fontsize=12)
+        # Set the x-axis label and tick labels.
+        ax.set_xlabel("Sentiment", fontsize=12, labelpad=20)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(categories, fontsize=12)
     
-    ax.set_title("Sentiment Distribution of Newspaper Headlines", fontsize=14, weight='bold')
-    ax.set_ylabel("Number of Headlines", fontsize=12)
-    ax.grid(True, which="both", linestyle='--', linewidth=0.5, alpha=0.7)
+        ax.set_title(title, fontsize=14, weight='bold')
+        ax.set_ylabel("Number of Headlines", fontsize=12)
+        ax.grid(True, which="both", linestyle='--', linewidth=0.5, alpha=0.7)
     
-    # If statistical results exist, add significance annotation between positive and negative bars.
-    if stats_results is not None:
-        p_val = stats_results.get("mannwhitney_p", None)
-        if p_val is not None:
-            if p_val > 0.05:
-                sig_symbol = "ns"
-            elif p_val <= 0.0001:
-                sig_symbol = "****"
-            elif p_val <= 0.001:
-                sig_symbol = "***"
-            elif p_val <= 0.01:
-                sig_symbol = "**"
-            else:
-                sig_symbol = "*"
+        # If statistical results exist, add significance annotation between positive and negative bars.
+        if stats_results is not None:
+            p_val = stats_results.get("mannwhitney_p", None)
+            if p_val is not None:
+                if p_val > 0.05:
+                    sig_symbol = "ns"
+                elif p_val <= 0.0001:
+                    sig_symbol = "****"
+                elif p_val <= 0.001:
+                    sig_symbol = "***"
+                elif p_val <= 0.01:
+                    sig_symbol = "**"
+                else:
+                    sig_symbol = "*"
             
-            # Positive bar is at index 0; Negative bar is at index 2.
-            x1, x2 = positions[0], positions[2]
-            y1 = counts[0] + errors[0]
-            y2 = counts[2] + errors[2]
-            line_y = max(y1, y2) + 5  # Position line above the tallest of the two bars
-            ax.plot([x1, x1, x2, x2], [line_y, line_y + 2, line_y + 2, line_y],
-                    lw=1.5, c='black')
-            mid_x = (x1 + x2) / 2
-            ax.text(mid_x, line_y + 3, sig_symbol,
-                    ha='center', va='bottom', fontsize=14, color='black')
+                # Positive bar is at index 0; Negative bar is at index 2.
+                x1, x2 = positions[0], positions[2]
+                y1 = counts[0] + errors[0]
+                y2 = counts[2] + errors[2]
+                line_y = max(y1, y2) + 5  # Position line above the tallest of the two bars
+                ax.plot([x1, x1, x2, x2], [line_y, line_y + 2, line_y + 2, line_y],
+                        lw=1.5, c='black')
+                mid_x = (x1 + x2) / 2
+                ax.text(mid_x, line_y + 3, sig_symbol,
+                        ha='center', va='bottom', fontsize=14, color='black')
     
-    plt.tight_layout()
-    plt.show()
+        fig.tight_layout()
+    return fig
+
+
+def plot_sentiment_by_group(groups, counts, title, xlabel):
+    """
+    Stacked bar chart of sentiment counts per group (e.g. per source or per month).
+
+    Parameters:
+      - groups: list of group labels, in display order.
+      - counts: mapping of lowercase sentiment label -> list of counts aligned with groups.
+    """
+    fig, ax = plt.subplots(figsize=(max(8, 0.35 * len(groups) + 2), 6))
+    positions = np.arange(len(groups))
+    bottom = np.zeros(len(groups))
+    for sentiment in ('positive', 'neutral', 'negative'):
+        values = np.array(counts.get(sentiment, [0] * len(groups)), dtype=float)
+        ax.bar(positions, values, width=0.8, bottom=bottom, label=sentiment.capitalize())
+        bottom += values
+
+    ax.set_xticks(positions)
+    ax.set_xticklabels(groups, rotation=60, ha='right', fontsize=9)
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel("Number of Headlines", fontsize=12)
+    ax.set_title(title, fontsize=14, weight='bold')
+    ax.legend()
+    ax.grid(True, axis='y', linestyle='--', linewidth=0.5, alpha=0.7)
+    fig.tight_layout()
     return fig
+
+
+def _render_supplementary_table(data):
+    import pandas as pd
+    return plot_supplementary_table(pd.DataFrame(data["rows"], columns=data["columns"]))
+
+
+def _render_sentiment_distribution(data):
+    p_val = data.get("mannwhitney_p")
+    # NaN (too few headlines to test) is drawn without an annotation.
+    stats_results = {"mannwhitney_p": p_val} if p_val is not None and p_val == p_val else None
+    return plot_sentiment_distribution(data["counts"], stats_results,
+                                       title=data.get("title", DISTRIBUTION_TITLE))
+
+
+def _render_sentiment_by_group(data):
+    return plot_sentiment_by_group(data["groups"], data["counts"], data["title"], data["xlabel"])
+
+
+# Chart kinds understood by render_charts; each takes the chart's "data"
+# aggregate (plain JSON-serialisable values) and returns a figure.
+CHART_RENDERERS = {
+    "supplementary_table": _render_supplementary_table,
+    "sentiment_distribution": _render_sentiment_distribution,
+    "sentiment_by_group": _render_sentiment_by_group,
+}
+
+# Bump when the look of the charts changes, so every cached figure is redrawn.
+CHART_STYLE_VERSION = 2
+MANIFEST_FILE = ".render_manifest.json"
+
+
+def chart_hash(chart, formats):
+    from artifacts import content_hash
+    return content_hash(CHART_STYLE_VERSION, chart["kind"], chart["data"], sorted(formats))
+
+
+def render_figure(chart):
+    """Render one chart spec ({"name", "kind", "data"}) to a figure in this process."""
+    return CHART_RENDERERS[chart["kind"]](chart["data"])
+
+
+def _render_to_files(chart, output_dir, formats):
+    # Runs in a worker process: always draw off-screen.
+    use_headless_backend()
+    return save_figure(render_figure(chart), output_dir, chart["name"], formats)
+
+
+def render_charts(charts, output_dir, formats=("png",), workers=None, force=False):
+    """
+    Export many charts in one call. Each chart is a dict with a unique
+    "name", a "kind" from CHART_RENDERERS and the precomputed "data" it is
+    drawn from. A chart is skipped when the hash of its data matches the one
+    recorded in output_dir's manifest and its files exist; the rest are drawn
+    with the Agg backend in a pool of worker processes.
+    Returns (rendered_names, skipped_names).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    pending, skipped = [], []
+    for chart in charts:
+        digest = chart_hash(chart, formats)
+        files = [os.path.join(output_dir, f"{chart['name']}.{fmt}") for fmt in formats]
+        if not force and manifest.get(chart["name"]) == digest and all(os.path.exists(p) for p in files):
+            skipped.append(chart["name"])
+        else:
+            pending.append((chart, digest))
+
+    if len(pending) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_headless_backend) as pool:
+            futures = [pool.submit(_render_to_files, chart, output_dir, formats) for chart, _ in pending]
+            for future in futures:
+                future.result()
+    else:
+        for chart, _ in pending:
+            _render_to_files(chart, output_dir, formats)
+
+    for chart, digest in pending:
+        manifest[chart["name"]] = digest
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return [chart["name"] for chart, _ in pending], skipped
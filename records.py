@@ -0,0 +1,65 @@
+# records.py
+import datetime
+import sys
+
+
+def date_ordinal(timestamp):
+    """
+    Proleptic Gregorian ordinal of an ISO timestamp's date part
+    ("2024-03-01T12:00:00Z" -> 738946), or None if it is missing or malformed.
+    """
+    if not timestamp:
+        return None
+    try:
+        return datetime.date.fromisoformat(timestamp[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+class HeadlineRecord:
+    """
+    One scraped headline, as it travels from a scraper to the database.
+
+    Records are slotted and keep the date as an integer ordinal, and source
+    names are interned, so a run holding many records pays for little more
+    than the headline text itself. Records compare and hash by
+    (source, headline, day), the same key the headlines table is deduplicated
+    on, so they can be put straight into a set.
+    """
+    __slots__ = ("source", "headline", "day")
+
+    # Every collected headline is accessible; kept as a class attribute so
+    # records do not pay for it.
+    accessible = True
+
+    def __init__(self, source, headline, day):
+        self.source = sys.intern(source)
+        self.headline = headline
+        self.day = day
+
+    @classmethod
+    def from_api(cls, source, headline, timestamp):
+        return cls(source, (headline or "").strip(), date_ordinal(timestamp))
+
+    @property
+    def date(self):
+        """The date as the ISO string stored in the database, or None."""
+        if self.day is None:
+            return None
+        return datetime.date.fromordinal(self.day).isoformat()
+
+    def row(self):
+        """(source, headline, date, accessible) as stored in the headlines table."""
+        return self.source, self.headline, self.date, int(self.accessible)
+
+    def __eq__(self, other):
+        if not isinstance(other, HeadlineRecord):
+            return NotImplemented
+        return (self.day == other.day and self.source == other.source
+                and self.headline == other.headline)
+
+    def __hash__(self):
+        return hash((self.source, self.headline, self.day))
+
+    def __repr__(self):
+        return f"HeadlineRecord({self.source!r}, {self.headline!r}, {self.date!r})"
@@ -1,21 +1,47 @@
+# resume_state.py
 import json
 import os
 
 RESUME_STATE_FILE = "resume_state.json"
 
-def load_resume_state():
+def resume_state_file(source):
     """
-    Load a dictionary mapping keywords to the next page number from the JSON file.
-    If the file doesn't exist, return an empty dictionary.
+    Resume-state file of a scraper source. The Guardian keeps the original
+    resume_state.json; every other source gets resume_state_<source>.json.
     """
-    if os.path.exists(RESUME_STATE_FILE):
-        with open(RESUME_STATE_FILE, "r") as f:
+    if source in (None, "guardian"):
+        return RESUME_STATE_FILE
+    return f"resume_state_{source}.json"
+
+def load_resume_state(file_path=RESUME_STATE_FILE):
+    if os.path.exists(file_path):
+        with open(file_path, "r") as f:
             return json.load(f)
     return {}
 
-def save_resume_state(state):
+def save_resume_state(state, file_path=RESUME_STATE_FILE):
+    with open(file_path, "w") as f:
+        json.dump(state, f, indent=4)
+
+# Resume-state value of a keyword whose results have all been fetched.
+KEYWORD_DONE = "done"
+
+def start_page(state, keyword):
+    """Page to resume a keyword at: its saved page, or 1 if it is new or finished."""
+    page = state.get(keyword, 1)
+    return 1 if page == KEYWORD_DONE else page
+
+def save_keyword_page(state, keyword, page, file_path=RESUME_STATE_FILE):
     """
-    Save the given dictionary (mapping keywords to the next page) into the JSON file.
+    Save the page a keyword should resume at. Page 1 means no progress, so
+    the keyword is dropped from the state rather than stored with page 1.
     """
-    with open(RESUME_STATE_FILE, "w") as f:
-        json.dump(state, f, indent=4)
+    if page > 1:
+        state[keyword] = page
+    else:
+        state.pop(keyword, None)
+    save_resume_state(state, file_path)
+
+def save_keyword_done(state, keyword, file_path=RESUME_STATE_FILE):
+    state[keyword] = KEYWORD_DONE
+    save_resume_state(state, file_path)
@@ -0,0 +1,31 @@
+# scrapers/__init__.py
+import importlib
+
+# Registered scraper classes, keyed by source name.
+SCRAPER_REGISTRY = {}
+
+# Modules that register the built-in sources. They are imported on first use
+# so that importing this package does not pull in requests.
+SCRAPER_MODULES = {
+    "guardian": "scrapers.guardian_scraper",
+    "newsapi": "scrapers.newsapi_scraper",
+}
+
+
+def register_scraper(cls):
+    """Class decorator adding a BaseScraper subclass to the registry under its source_name."""
+    SCRAPER_REGISTRY[cls.source_name] = cls
+    return cls
+
+
+def get_scraper_class(name):
+    if name not in SCRAPER_REGISTRY and name in SCRAPER_MODULES:
+        importlib.import_module(SCRAPER_MODULES[name])
+    try:
+        return SCRAPER_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown scraper source: {name!r}") from None
+
+
+def available_sources():
+    return sorted(set(SCRAPER_MODULES) | set(SCRAPER_REGISTRY))
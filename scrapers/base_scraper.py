@@ -1,16 +1,50 @@
 # scrapers/base_scraper.py
+import time
 from abc import ABC, abstractmethod
 
 class BaseScraper(ABC):
-    def __init__(self, api_key, from_date, to_date, keywords, page_size, max_pages):
+    # Name used in the scraper registry, resume-state file names and run reports.
+    source_name = None
+
+    def __init__(self, api_key, from_date, to_date, keywords, page_size, max_pages,
+                 request_interval=0.5):
         self.api_key = api_key
         self.from_date = from_date
         self.to_date = to_date
         self.keywords = keywords
         self.page_size = page_size
         self.max_pages = max_pages
+        # Minimum number of seconds between two requests made by this scraper.
+        self.request_interval = request_interval
+        self._last_request = 0.0
+
+    @classmethod
+    @abstractmethod
+    def from_config(cls, from_date, to_date, keywords):
+        """Build the scraper with the API keys and settings from config.py."""
+        pass
 
     @abstractmethod
-    def collect_headlines(self):
-        """Scrape headlines given the parameters."""
+    def iter_pages(self):
+        """
+        Fetch result pages for every keyword, resuming where the previous run
+        stopped. Yields (keyword, page, articles) with the raw API results.
+        """
         pass
+
+    @abstractmethod
+    def article_id(self, art):
+        """Stable id of one raw API result, used to deduplicate the raw archive."""
+        pass
+
+    @abstractmethod
+    def parse_article(self, art):
+        """Convert one raw API result into a records.HeadlineRecord."""
+        pass
+
+    def throttle(self):
+        """Sleep just long enough to keep request_interval between requests."""
+        wait = self._last_request + self.request_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
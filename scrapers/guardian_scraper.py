@@ -1,11 +1,13 @@
 import requests
-import time
-import os
-import json
-from config import HEADERS
+from config import HEADERS, GUARDIAN_CONFIG, GUARDIAN_API_KEYS
+from . import register_scraper
 from .base_scraper import BaseScraper
-from resume_state import load_resume_state, save_resume_state
+from records import HeadlineRecord
+from resume_state import (
+    load_resume_state, resume_state_file, save_keyword_done, save_keyword_page, start_page
+)
 
+@register_scraper
 class GuardianScraper(BaseScraper):
     """
     Scraper for Guardian articles using its official Content API.
@@ -13,12 +15,27 @@ class GuardianScraper(BaseScraper):
     if one reaches its rate limit. It also updates the resume_state.json
     file so that on subsequent runs it resumes where it left off.
     """
-    def __init__(self, api_keys, from_date, to_date, keywords, page_size, max_pages=None):
+    source_name = "guardian"
+
+    def __init__(self, api_keys, from_date, to_date, keywords, page_size, max_pages=None,
+                 base_url=GUARDIAN_CONFIG["base_url"],
+                 request_interval=GUARDIAN_CONFIG["request_interval"],
+                 show_fields=GUARDIAN_CONFIG["show_fields"], show_tags=GUARDIAN_CONFIG["show_tags"]):
         # max_pages is not used – we loop until no more articles are returned.
         self.api_keys = api_keys
         self.current_key_index = 0  # Start with the first key.
-        super().__init__(self.current_api_key(), from_date, to_date, keywords, page_size, max_pages)
-        self.base_url = "https://content.guardianapis.com/search"
+        # Set once every key has hit its rate limit; requests cannot succeed until the quota resets.
+        self.keys_exhausted = False
+        super().__init__(self.current_api_key(), from_date, to_date, keywords, page_size, max_pages,
+                         request_interval=request_interval)
+        self.base_url = base_url
+        self.show_fields = show_fields
+        self.show_tags = show_tags
+
+    @classmethod
+    def from_config(cls, from_date, to_date, keywords):
+        # page_size is not sent in this mode, so resume pages keep their meaning.
+        return cls(GUARDIAN_API_KEYS, from_date, to_date, keywords, page_size=None)
 
     def current_api_key(self):
         if self.api_keys:
@@ -36,82 +53,90 @@ class GuardianScraper(BaseScraper):
         print("No more API keys available.")
         return False
 
-    def collect_headlines(self):
-        resume_state = load_resume_state()
-        all_headlines = []
+    def fetch_page(self, keyword, page, from_date=None, to_date=None, page_size=None):
+        """
+        Request one page of search results, rotating API keys on rate limits.
+        Returns the decoded "response" object of the Guardian API, or None if
+        the page could not be fetched (the reason is printed).
+        """
+        from_date = from_date or self.from_date
+        to_date = to_date or self.to_date
+        while True:
+            params = {
+                "q": keyword,
+                "from-date": from_date.isoformat(),
+                "to-date": to_date.isoformat(),
+                "page": page,
+                "api-key": self.current_api_key()
+            }
+            if page_size:
+                params["page-size"] = page_size
+            if self.show_fields:
+                params["show-fields"] = self.show_fields
+            if self.show_tags:
+                params["show-tags"] = self.show_tags
+            self.throttle()
+            try:
+                response = requests.get(self.base_url, params=params, headers=HEADERS, timeout=10)
+            except Exception as e:
+                print(f"Error on keyword '{keyword}', page {page}: {e}")
+                return None
+
+            if response.status_code == 429:
+                print(f"Rate limit exceeded on keyword '{keyword}', page {page} using key {self.current_api_key()}.")
+                if self.rotate_api_key():
+                    # Retry the same page with the new key.
+                    continue
+                self.keys_exhausted = True
+                return None
+
+            if response.status_code != 200:
+                print(f"Error: Status code {response.status_code} on keyword '{keyword}', page {page}")
+                print("Response text:", response.text)
+                return None
+
+            data = response.json()
+            if data.get("response", {}).get("status") != "ok":
+                print(f"Error: Guardian API status not ok for keyword '{keyword}'.")
+                print("Message:", data.get("response", {}).get("message"))
+                return None
+            return data["response"]
+
+    def article_id(self, art):
+        return art.get("id")
+
+    def parse_article(self, art):
+        """Convert one Guardian API result into a headline record."""
+        return HeadlineRecord.from_api("The Guardian", art.get("webTitle"), art.get("webPublicationDate"))
+
+    def iter_pages(self):
+        resume_file = resume_state_file(self.source_name)
+        resume_state = load_resume_state(resume_file)
         for keyword in self.keywords:
             print(f"Searching Guardian API for keyword: '{keyword}'...")
             # Start at the page stored for this keyword, or at page 1 if no state exists.
-            page = resume_state.get(keyword, 1)
+            page = start_page(resume_state, keyword)
             while True:
-                params = {
-                    "q": keyword,
-                    "from-date": self.from_date.isoformat(),
-                    "to-date": self.to_date.isoformat(),
-                    "page": page,
-                    "api-key": self.current_api_key()
-                }
-                try:
-                    response = requests.get(self.base_url, params=params, headers=HEADERS, timeout=10)
-                except Exception as e:
-                    print(f"Error on keyword '{keyword}', page {page}: {e}")
-                    resume_state[keyword] = page
-                    save_resume_state(resume_state)
+                data = self.fetch_page(keyword, page)
+                if data is None:
+                    # Save progress so the next run retries this page.
+                    save_keyword_page(resume_state, keyword, page, resume_file)
                     break
 
-                if response.status_code == 429:
-                    print(f"Rate limit exceeded on keyword '{keyword}', page {page} using key {self.current_api_key()}.")
-                    if self.rotate_api_key():
-                        # Retry the same page with the new key.
-                        continue
-                    else:
-                        # If no API keys remain, save progress and return collected headlines.
-                        resume_state[keyword] = page
-                        save_resume_state(resume_state)
-                        break
-
-                if response.status_code != 200:
-                    print(f"Error: Status code {response.status_code} on keyword '{keyword}', page {page}")
-                    print("Response text:", response.text)
-                    resume_state[keyword] = page
-                    save_resume_state(resume_state)
-                    break
-
-                data = response.json()
-                if data.get("response", {}).get("status") != "ok":
-                    print(f"Error: Guardian API status not ok for keyword '{keyword}'.")
-                    print("Message:", data.get("response", {}).get("message"))
-                    resume_state[keyword] = page
-                    save_resume_state(resume_state)
-                    break
-
-                articles = data.get("response", {}).get("results", [])
+                articles = data.get("results", [])
                 if not articles:
                     print(f"No more articles found for '{keyword}' at page {page}.")
-                    # Reset state for this keyword, indicating it's complete.
-                    resume_state[keyword] = 1
-                    save_resume_state(resume_state)
+                    # Mark the keyword as finished.
+                    save_keyword_done(resume_state, keyword, resume_file)
                     break
 
-                for art in articles:
-                    headline = art.get("webTitle", "").strip()
-                    pub_date = art.get("webPublicationDate", None)
-                    all_headlines.append({
-                        "source": "The Guardian",
-                        "headline": headline,
-                        "date": pub_date.split("T")[0] if pub_date else None,
-                        "accessible": True
-                    })
+                yield keyword, page, articles
                 print(f"Retrieved {len(articles)} articles on page {page} for keyword '{keyword}'.")
+                if page >= data.get("pages", page + 1):
+                    # The API answers pages past the last one with an error, so
+                    # finish the keyword here instead of requesting them.
+                    print(f"Reached the last page ({page}) for '{keyword}'.")
+                    save_keyword_done(resume_state, keyword, resume_file)
+                    break
                 page += 1
-                resume_state[keyword] = page
-                save_resume_state(resume_state)
-                time.sleep(0.5)
-
-        return self._deduplicate(all_headlines)
-
-    def _deduplicate(self, headlines):
-        deduped = {(item["source"], item["headline"], item["date"]): item for item in headlines}
-        deduped_headlines = list(deduped.values())
-        print(f"Collected {len(deduped_headlines)} deduplicated Guardian headlines.")
-        return deduped_headlines
+                save_keyword_page(resume_state, keyword, page, resume_file)
@@ -1,22 +1,38 @@
 # scrapers/newsapi_scraper.py
 import requests
-import time
-from config import HEADERS
+from config import NEWSAPI_API_KEY, NEWSAPI_CONFIG
+from . import register_scraper
 from .base_scraper import BaseScraper
+from records import HeadlineRecord
+from resume_state import (
+    load_resume_state, resume_state_file, save_keyword_done, save_keyword_page, start_page
+)
 
+@register_scraper
 class NewsAPIScraper(BaseScraper):
     """
     General scraper using NewsAPI's 'everything' endpoint, with debugging output.
+    Progress is tracked per keyword in resume_state_newsapi.json, the same way
+    the Guardian scraper uses resume_state.json.
     """
-    def __init__(self, api_key, from_date, to_date, keywords, page_size, max_pages=None):
-        super().__init__(api_key, from_date, to_date, keywords, page_size, max_pages)
-        self.base_url = "https://newsapi.org/v2/everything"
+    source_name = "newsapi"
 
-    def collect_headlines(self):
-        all_headlines = []
+    def __init__(self, api_key, from_date, to_date, keywords, page_size, max_pages=None,
+                 request_interval=NEWSAPI_CONFIG["request_interval"]):
+        super().__init__(api_key, from_date, to_date, keywords, page_size, max_pages,
+                         request_interval=request_interval)
+        self.base_url = NEWSAPI_CONFIG["base_url"]
+
+    @classmethod
+    def from_config(cls, from_date, to_date, keywords):
+        return cls(NEWSAPI_API_KEY, from_date, to_date, keywords, page_size=NEWSAPI_CONFIG["page_size"])
+
+    def iter_pages(self):
+        resume_file = resume_state_file(self.source_name)
+        resume_state = load_resume_state(resume_file)
         for keyword in self.keywords:
             print(f"Searching NewsAPI for keyword: '{keyword}'...")
-            page = 1
+            page = start_page(resume_state, keyword)
             while True:
                 params = {
                     "q": keyword,
@@ -27,45 +43,42 @@ class NewsAPIScraper(BaseScraper):
                     "apiKey": self.api_key,
                     "language": "en"
                 }
+                self.throttle()
                 try:
                     response = requests.get(self.base_url, params=params, timeout=10)
                 except Exception as e:
                     print(f"Request error for keyword '{keyword}', page {page}: {e}")
+                    save_keyword_page(resume_state, keyword, page, resume_file)
                     break
 
                 if response.status_code != 200:
                     print(f"Error: Received status code {response.status_code} for keyword '{keyword}', page {page}")
                     print("Response text:", response.text)
+                    save_keyword_page(resume_state, keyword, page, resume_file)
                     break
 
                 data = response.json()
                 if data.get("status") != "ok":
                     print(f"Error: API status not ok for keyword '{keyword}'. Message: {data.get('message')}")
+                    save_keyword_page(resume_state, keyword, page, resume_file)
                     break
 
                 articles = data.get("articles", [])
                 if not articles:
                     print(f"No more articles found for '{keyword}' on page {page}.")
+                    # Mark the keyword as finished.
+                    save_keyword_done(resume_state, keyword, resume_file)
                     break
 
-                for art in articles:
-                    headline = art.get("title", "").strip()
-                    published_at = art.get("publishedAt")
-                    source_name = art.get("source", {}).get("name", "Unknown")
-                    all_headlines.append({
-                        "source": source_name,
-                        "headline": headline,
-                        "date": published_at.split("T")[0] if published_at else None,
-                        "accessible": True
-                    })
+                yield keyword, page, articles
                 print(f"Retrieved {len(articles)} articles on page {page} for keyword '{keyword}'.")
                 page += 1
-                time.sleep(0.5)
-        # Deduplicate headlines.
-        deduped = {}
-        for item in all_headlines:
-            key = (item["source"], item["headline"], item["date"])
-            deduped[key] = item
-        deduped_headlines = list(deduped.values())
-        print(f"Collected {len(deduped_headlines)} deduplicated headlines across {len(self.keywords)} keywords.")
-        return deduped_headlines
+                save_keyword_page(resume_state, keyword, page, resume_file)
+
+    def article_id(self, art):
+        # NewsAPI results have no id; the article URL identifies them.
+        return art.get("url")
+
+    def parse_article(self, art):
+        source_name = (art.get("source") or {}).get("name") or "Unknown"
+        return HeadlineRecord.from_api(source_name, art.get("title"), art.get("publishedAt"))
@@ -0,0 +1,274 @@
+# sentiment_backends.py
+import hashlib
+import math
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+
+from config import SENTIMENT_MODEL_PATH
+
+# numpy (and scipy) are imported where they are used, so the CLI can list the
+# registered backends without loading them.
+
+# Compound-score thresholds used by VADER (and therefore by every backend)
+# to turn a score into a label.
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Registered backend classes, keyed by name.
+BACKEND_REGISTRY = {}
+
+
+def register_backend(cls):
+    """Class decorator adding a SentimentBackend subclass to the registry under its name."""
+    BACKEND_REGISTRY[cls.name] = cls
+    return cls
+
+
+def get_backend(name, **kwargs):
+    try:
+        backend_class = BACKEND_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown sentiment backend: {name!r}") from None
+    return backend_class(**kwargs)
+
+
+def available_backends():
+    return sorted(BACKEND_REGISTRY)
+
+
+def label_scores(scores):
+    """Map compound scores to 'positive'/'negative'/'neutral' (None for NaN)."""
+    labels = []
+    for score in scores:
+        if score != score:  # NaN: the headline was missing.
+            labels.append(None)
+        elif score >= POSITIVE_THRESHOLD:
+            labels.append("positive")
+        elif score <= NEGATIVE_THRESHOLD:
+            labels.append("negative")
+        else:
+            labels.append("neutral")
+    return labels
+
+
+class SentimentBackend(ABC):
+    """
+    A sentiment scorer working on batches of headlines. Backends produce a
+    VADER-style compound score in [-1, 1]; labels are derived from it with
+    the same thresholds for every backend so their outputs are comparable.
+    """
+    name = None
+    # Bump when a backend's scores change, so stored scores are recomputed.
+    version = 1
+
+    @property
+    def scorer_id(self):
+        """Identifies the scores this backend produces (stored with the scores artifact)."""
+        return f"{self.name}-v{self.version}"
+
+    @abstractmethod
+    def compound_scores(self, texts):
+        """Return a float array of compound scores, one per (non-missing) text."""
+        pass
+
+    def score_batch(self, texts):
+        """
+        Score a batch of headlines. Missing headlines (None/NaN) get a NaN
+        score and a None label. Returns (scores, labels).
+        """
+        import numpy as np
+
+        texts = list(texts)
+        present = [i for i, text in enumerate(texts) if isinstance(text, str)]
+        scores = np.full(len(texts), np.nan)
+        if present:
+            scores[present] = self.compound_scores([texts[i] for i in present])
+        return scores, label_scores(scores)
+
+
+@register_backend
+class VaderBackend(SentimentBackend):
+    """NLTK's VADER analyzer, built from the locally cached lexicon."""
+    name = "vader"
+
+    def __init__(self):
+        from analysis import make_vader_analyzer
+        self.sia = make_vader_analyzer()
+
+    def compound_scores(self, texts):
+        import numpy as np
+        return np.array([self.sia.polarity_scores(text)["compound"] for text in texts])
+
+
+_TOKEN_RE = re.compile(r"[\w']+|[^\w\s]")
+
+
+@register_backend
+class LexiconBackend(SentimentBackend):
+    """
+    A stripped-down VADER: the same lexicon, negation, booster-word and "but"
+    rules and the same normalisation, but none of the per-token punctuation,
+    capitalisation and idiom handling. Tokens are split with one precompiled
+    regex and valences, negations and boosters are merged into a single
+    lookup table up front.
+    """
+    name = "lexicon"
+
+    # Lookup-table marker for negation words.
+    _NEGATION = "negation"
+
+    def __init__(self):
+        from nltk.sentiment.vader import VaderConstants
+        from lexicon import load_vader_lexicon
+
+        constants = VaderConstants()
+        self.negation_scalar = constants.N_SCALAR
+        self.alpha = 15
+        self.table = dict(load_vader_lexicon())
+        for word in constants.NEGATE:
+            self.table.setdefault(word, self._NEGATION)
+        self.boosters = {word: increment for word, increment in constants.BOOSTER_DICT.items()}
+
+    def _score(self, text):
+        tokens = _TOKEN_RE.findall(text.lower())
+        table = self.table
+        valences = []
+        but_index = None
+        for i, token in enumerate(tokens):
+            if token == "but":
+                but_index = len(valences)
+            entry = table.get(token)
+            if entry is None or entry == self._NEGATION:
+                continue
+            valence = entry
+            for back in range(1, 4):
+                if i < back:
+                    break
+                previous = tokens[i - back]
+                increment = self.boosters.get(previous)
+                if increment is not None and back == 1:
+                    valence += increment if valence > 0 else -increment
+                if table.get(previous) == self._NEGATION or previous.endswith("n't"):
+                    valence *= self.negation_scalar
+                    break
+            valences.append(valence)
+        if but_index is not None:
+            valences = [v * 0.5 for v in valences[:but_index]] + [v * 1.5 for v in valences[but_index:]]
+        total = sum(valences)
+        if not total:
+            return 0.0
+        return round(total / math.sqrt(total * total + self.alpha), 4)
+
+    def compound_scores(self, texts):
+        import numpy as np
+        return np.array([self._score(text) for text in texts])
+
+
+class HashedTfidfVectorizer:
+    """
+    Unigram + bigram TF-IDF features hashed into a fixed number of columns,
+    so the vocabulary never has to be stored. Rows are L2-normalised.
+    """
+    def __init__(self, n_features=2 ** 18, idf=None):
+        self.n_features = n_features
+        self.idf = idf
+
+    def _token_ids(self, text):
+        tokens = re.findall(r"[\w']+", text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return [zlib.crc32(gram.encode("utf-8")) % self.n_features for gram in grams]
+
+    def term_counts(self, texts):
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        indptr = [0]
+        indices = []
+        for text in texts:
+            indices.extend(self._token_ids(text))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        counts = csr_matrix((data, np.array(indices, dtype=np.int64), np.array(indptr)),
+                            shape=(len(texts), self.n_features))
+        counts.sum_duplicates()
+        return counts
+
+    def fit(self, texts):
+        import numpy as np
+
+        counts = self.term_counts(texts)
+        document_frequency = np.bincount(counts.indices, minlength=self.n_features)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def transform(self, texts):
+        import numpy as np
+        from scipy.sparse import diags
+
+        counts = self.term_counts(texts)
+        counts.data = 1 + np.log(counts.data)
+        weighted = counts @ diags(self.idf)
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return diags(1 / norms) @ weighted
+
+
+@register_backend
+class TfidfLinearBackend(SentimentBackend):
+    """
+    A linear regression on hashed TF-IDF features that predicts the compound
+    score. Inference is one sparse matrix-vector product per batch. Train it
+    with train_tfidf_model (``python main.py train-tfidf``), which fits it to
+    the stored VADER scores.
+    """
+    name = "tfidf"
+
+    def __init__(self, model_path=SENTIMENT_MODEL_PATH):
+        import numpy as np
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No TF-IDF model at '{model_path}'. Train one with: python main.py train-tfidf")
+        with open(model_path, "rb") as f:
+            # Retraining changes the scores, so the model's content is part of its id.
+            self.model_hash = hashlib.sha256(f.read()).hexdigest()[:12]
+        model = np.load(model_path)
+        self.vectorizer = HashedTfidfVectorizer(int(model["n_features"]), model["idf"])
+        self.weights = model["weights"]
+        self.bias = float(model["bias"])
+
+    @property
+    def scorer_id(self):
+        return f"{self.name}-v{self.version}-{self.model_hash}"
+
+    def compound_scores(self, texts):
+        import numpy as np
+        predictions = self.vectorizer.transform(texts) @ self.weights + self.bias
+        return np.round(np.clip(predictions, -1.0, 1.0), 4)
+
+
+def train_tfidf_model(texts, targets, model_path=SENTIMENT_MODEL_PATH, n_features=2 ** 18, damp=0.05):
+    """
+    Fit the TF-IDF linear model to target compound scores with damped least
+    squares and save it to model_path. Returns the training RMSE.
+    """
+    import numpy as np
+    from scipy.sparse.linalg import lsqr
+
+    texts = list(texts)
+    targets = np.asarray(targets, dtype=np.float64)
+    vectorizer = HashedTfidfVectorizer(n_features).fit(texts)
+    features = vectorizer.transform(texts)
+    bias = float(targets.mean())
+    weights = lsqr(features, targets - bias, damp=damp)[0].astype(np.float32)
+    rmse = float(np.sqrt(np.mean((features @ weights + bias - targets) ** 2)))
+
+    directory = os.path.dirname(model_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(model_path, "wb") as f:
+        np.savez_compressed(f, n_features=n_features, idf=vectorizer.idf,
+                            weights=weights, bias=bias)
+    return rmse